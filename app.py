@@ -1,480 +1,88 @@
-from flask import Flask, render_template, request, jsonify, send_file
-from groq import Groq
-from fpdf import FPDF
-from fpdf.enums import XPos, YPos
-import os, json, uuid, io, re
+from flask import (Flask, Response, render_template, request, jsonify,
+                   send_file, stream_with_context, g, has_request_context)
+from werkzeug.middleware.proxy_fix import ProxyFix
+import os, json, uuid, re, time, math, hashlib
+from contextlib import contextmanager
 from datetime import datetime
-from dotenv import load_dotenv
+from history_store import LazyStore, FILTER_FIELDS
+from cache import open_llm_cache, open_pdf_cache, content_key
+from llm_async import Overloaded
+from llm_gateway import LLMGateway, CircuitOpen, make_client, make_async_client
+from ratelimit import open_limiter, RateLimited
+from jobs import JobStore, JobQueue, QueueFull, check_callback
+from sqlite_conn import writable_path
+from resume_parser import (parse_output, parse_structured, OutputParser,
+                           PARSER_VERSION)
+from pdf_pool import PDFRenderPool, PoolBusy
+from batch import parse_items, stream_zip, BatchError
+import resume_schema, prompt_budget, metrics, pdf_templates, exporters, section_edit
+from pdf_templates import LAYOUT_VERSION
+from metrics import span
+from concurrent.futures import TimeoutError as FutureTimeout, BrokenExecutor
+import io
 
 app = Flask(__name__)
-
-load_dotenv()
+# INFO carries the per-request token estimates; LOG_LEVEL=WARNING hides them.
+app.logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+metrics.install(app)
+
+# groq, httpx and fpdf2 are imported on first use, not here: a cold start
+# (api/index.py on Vercel) only pays for what its first route needs.
+# bench/profile_imports.py reports import costs, bench/check_cold_start.py
+# holds the line. .env is for local development; deployments set real env vars.
+if os.path.exists(".env") or os.path.exists(os.path.join(os.path.dirname(__file__), ".env")):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Behind N reverse proxies, take the client IP from X-Forwarded-For
+TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-# 🔴 MISSING LINE (CAUSE OF 500 ERROR)
-client = Groq(api_key=GROQ_API_KEY)
-
-DB_FILE = "resumes_db.json"
-
-def load_db():
-    if not os.path.exists(DB_FILE):
-        return []
-    with open(DB_FILE, "r") as f:
-        return json.load(f)
-
-def save_db(data):
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-def clean(text):
-    chars = {
-        "\u2018":"'","\u2019":"'","\u201c":'"',"\u201d":'"',
-        "\u2013":"-","\u2014":"-","\u2022":"-","\u2026":"...",
-        "\u00a0":" ","\u00b7":"-","\u2015":"-","\u2012":"-",
-    }
-    for k,v in chars.items():
-        text = text.replace(k,v)
-    return text.encode("latin-1", errors="replace").decode("latin-1")
-
-# ─────────────────────────────────────────────────────────────
-#  RESUME PDF — clean template style
-# ─────────────────────────────────────────────────────────────
-def build_resume_pdf(data):
-    pdf = FPDF()
-    pdf.set_margins(0, 0, 0)
-    pdf.set_auto_page_break(auto=True, margin=10)
-    pdf.add_page()
-
-    W  = 210
-    M  = 12
-    CW = W - 2*M
-
-    # ── HEADER: Name left, contact right ─────────────────────
-    header_h = 34
-    pdf.set_fill_color(255,255,255)
-    pdf.rect(0, 0, W, header_h, "F")
-
-    name = clean(data.get("name","Your Name"))
-    pdf.set_xy(M, 9)
-    pdf.set_font("Helvetica","B", 20)
-    pdf.set_text_color(15,15,15)
-    pdf.cell(105, 10, name)
-
-    # Contact block - right side
-    contact = []
-    if data.get("phone"):    contact.append(clean(data["phone"]))
-    if data.get("email"):    contact.append(clean(data["email"]))
-    if data.get("linkedin"): contact.append(clean(data["linkedin"]))
-    if data.get("location"): contact.append(clean(data["location"]))
-
-    pdf.set_font("Helvetica","", 8)
-    pdf.set_text_color(60,60,60)
-    cy = 8
-    for c in contact:
-        pdf.set_xy(M+105, cy)
-        pdf.cell(CW-105, 5, c, align="R",
-                 new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        cy += 5.5
-
-    # Divider
-    pdf.set_y(header_h)
-    pdf.set_draw_color(20,20,20)
-    pdf.set_line_width(0.7)
-    pdf.line(M, header_h, W-M, header_h)
-    pdf.set_line_width(0.2)
-    pdf.ln(3)
-
-    # ── HELPERS ──────────────────────────────────────────────
-    def section_title(txt):
-        pdf.set_x(M)
-        pdf.set_font("Helvetica","B",10.5)
-        pdf.set_text_color(15,15,15)
-        pdf.cell(CW, 5.5, txt, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        pdf.set_draw_color(160,160,160)
-        pdf.line(M, pdf.get_y(), W-M, pdf.get_y())
-        pdf.ln(2.5)
-
-    def bullet_point(txt):
-        pdf.set_x(M+3)
-        pdf.set_font("Helvetica","",9)
-        pdf.set_text_color(50,50,50)
-        pdf.cell(5, 5, "-", new_x=XPos.RIGHT, new_y=YPos.TOP)
-        pdf.set_x(M+9)
-        pdf.multi_cell(CW-9, 5, clean(txt))
-
-    def tag_row(items):
-        """Draw items as grey bordered tag boxes, wrapping to next line."""
-        x = M
-        y = pdf.get_y()
-        pdf.set_font("Helvetica","",8.5)
-        for item in items:
-            item = clean(item.strip())
-            if not item: continue
-            tw = pdf.get_string_width(item) + 8
-            if x + tw > W - M:
-                x  = M
-                y += 6.5
-            pdf.set_fill_color(242,242,242)
-            pdf.set_draw_color(190,190,190)
-            pdf.set_text_color(35,35,35)
-            pdf.rect(x, y, tw, 5.8, "FD")
-            pdf.set_xy(x+1, y+0.8)
-            pdf.cell(tw-2, 4.2, item)
-            x += tw + 3
-        pdf.set_y(y + 6.5)
-
-    # ── SUMMARY ──────────────────────────────────────────────
-    summary = clean(data.get("summary","").strip())
-    if summary:
-        section_title("Summary")
-        pdf.set_x(M)
-        pdf.set_font("Helvetica","",9)
-        pdf.set_text_color(50,50,50)
-        pdf.multi_cell(CW, 5, summary)
-        pdf.ln(2)
-
-    # ── SKILLS ───────────────────────────────────────────────
-    skills = [s for s in data.get("skills",[]) if s.strip()]
-    if skills:
-        section_title("Skills")
-        tag_row(skills)
-        pdf.ln(1)
-
-    # ── EDUCATION ────────────────────────────────────────────
-    education = data.get("education",[])
-    if education:
-        section_title("Education")
-        for edu in education:
-            inst  = clean(edu.get("institution",""))
-            deg   = clean(edu.get("degree",""))
-            yr    = clean(edu.get("year",""))
-            grade = clean(edu.get("grade",""))
-            loc   = clean(edu.get("location",""))
-
-            # Institution (bold left) + Location (italic right)
-            pdf.set_x(M)
-            pdf.set_font("Helvetica","B",10)
-            pdf.set_text_color(15,15,15)
-            pdf.cell(CW-45, 5.5, inst, new_x=XPos.RIGHT, new_y=YPos.TOP)
-            pdf.set_font("Helvetica","I",8.5)
-            pdf.set_text_color(110,110,110)
-            pdf.cell(45, 5.5, loc, align="R",
-                     new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-            # Degree (semi-bold)
-            if deg:
-                pdf.set_x(M)
-                pdf.set_font("Helvetica","B",9)
-                pdf.set_text_color(40,40,40)
-                pdf.cell(CW, 5, deg, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-            # Year + Grade
-            sub = "  |  ".join(filter(None,[yr,grade]))
-            if sub:
-                pdf.set_x(M)
-                pdf.set_font("Helvetica","",8.5)
-                pdf.set_text_color(110,110,110)
-                pdf.cell(CW, 4.5, sub, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-            pdf.ln(2)
-
-    # ── EXPERIENCE ───────────────────────────────────────────
-    experience = data.get("experience",[])
-    if experience:
-        section_title("Experience")
-        for exp in experience:
-            company = clean(exp.get("company",""))
-            role    = clean(exp.get("role",""))
-            start   = clean(exp.get("start",""))
-            end     = clean(exp.get("end",""))
-            loc     = clean(exp.get("location",""))
-            bullets = exp.get("bullets",[])
-
-            dates = (start + (" - " + end if end else "")).strip()
-
-            # Company bold left, location italic right
-            pdf.set_x(M)
-            pdf.set_font("Helvetica","B",10)
-            pdf.set_text_color(15,15,15)
-            pdf.cell(CW-45, 5, company, new_x=XPos.RIGHT, new_y=YPos.TOP)
-            pdf.set_font("Helvetica","I",8)
-            pdf.set_text_color(110,110,110)
-            pdf.cell(45, 5, loc, align="R",
-                     new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-            # Role
-            if role:
-                pdf.set_x(M)
-                pdf.set_font("Helvetica","B",9)
-                pdf.set_text_color(40,40,40)
-                pdf.cell(CW, 4.5, role, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-            # Dates
-            if dates:
-                pdf.set_x(M)
-                pdf.set_font("Helvetica","",8)
-                pdf.set_text_color(110,110,110)
-                pdf.cell(CW, 4, dates, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-            for b in bullets:
-                bullet_point(b)
-            pdf.ln(2)
-
-    # ── PROJECTS ─────────────────────────────────────────────
-    projects = data.get("projects",[])
-    if projects:
-        section_title("Projects")
-        for proj in projects:
-            pname = clean(proj.get("name",""))
-            tech  = clean(proj.get("tech",""))
-            header = pname + (" | " + tech if tech else "")
-            pdf.set_x(M)
-            pdf.set_font("Helvetica","B",9.5)
-            pdf.set_text_color(20,20,20)
-            pdf.multi_cell(CW, 5.5, header)
-            for b in proj.get("bullets",[]):
-                bullet_point(b)
-            pdf.ln(2)
-
-    # ── CERTIFICATIONS ───────────────────────────────────────
-    certs = data.get("certifications",[])
-    if certs:
-        section_title("Certifications")
-        for c in certs:
-            bullet_point(c)
-        pdf.ln(2)
-
-    # ── LANGUAGES ────────────────────────────────────────────
-    langs = data.get("languages",[])
-    if langs:
-        section_title("Language")
-        lang_str = ",  ".join([clean(l.strip()) for l in langs if l.strip()])
-        pdf.set_x(M)
-        pdf.set_font("Helvetica","",9)
-        pdf.set_text_color(50,50,50)
-        pdf.multi_cell(CW, 5, lang_str)
-        pdf.ln(1)
-
-    buf = io.BytesIO(pdf.output())
-    buf.seek(0)
-    return buf
-
-
-# ─────────────────────────────────────────────────────────────
-#  COVER LETTER PDF
-# ─────────────────────────────────────────────────────────────
-def build_cover_pdf(name, job_title, content):
-    pdf = FPDF()
-    pdf.set_margins(20,20,20)
-    pdf.set_auto_page_break(auto=True, margin=20)
-    pdf.add_page()
-    W=210; M=20; CW=W-2*M
-
-    pdf.set_fill_color(26,71,42)
-    pdf.rect(0,0,W,40,"F")
-    pdf.set_xy(0,9)
-    pdf.set_font("Helvetica","B",18)
-    pdf.set_text_color(255,255,255)
-    pdf.cell(W,11,clean(name.upper()),
-             new_x=XPos.LMARGIN,new_y=YPos.NEXT,align="C")
-    pdf.set_font("Helvetica","",9)
-    pdf.set_text_color(190,230,190)
-    pdf.cell(W,7,clean(f"Cover Letter - {job_title}"),
-             new_x=XPos.LMARGIN,new_y=YPos.NEXT,align="C")
-    pdf.ln(14)
-
-    for raw in content.split("\n"):
-        s = clean(re.sub(r'\*\*(.+?)\*\*',r'\1',raw.strip()))
-        if not s:
-            pdf.ln(3); continue
-        pdf.set_x(M)
-        pdf.set_font("Helvetica","",10)
-        pdf.set_text_color(50,50,50)
-        pdf.multi_cell(CW,6,s)
-
-    buf = io.BytesIO(pdf.output())
-    buf.seek(0)
-    return buf
-
-
-# ─────────────────────────────────────────────────────────────
-#  PARSE AI TEXT → structured dict
-# ─────────────────────────────────────────────────────────────
-def parse_structured(resume_text, raw):
-    d = {
-        "name":     raw.get("name",""),
-        "email":    raw.get("email",""),
-        "phone":    raw.get("phone",""),
-        "linkedin": raw.get("linkedin",""),
-        "location": raw.get("location",""),
-        "summary":"", "skills":[], "experience":[],
-        "education":[], "projects":[], "certifications":[], "languages":[]
-    }
-
-    # Pull skills directly from form data (most reliable)
-    raw_skills = raw.get("skills","")
-    if raw_skills:
-        for sk in re.split(r'[,\n]', raw_skills):
-            sk = sk.strip().lstrip("-* ")
-            if sk: d["skills"].append(sk)
-
-    # Pull languages directly from form data
-    raw_langs = raw.get("languages","")
-    if raw_langs:
-        for l in re.split(r'[,\n]', raw_langs):
-            l = l.strip()
-            if l: d["languages"].append(l)
-
-    SECTION_MAP = {
-        "SUMMARY":"summary","PROFILE":"summary","OBJECTIVE":"summary",
-        "PROFESSIONAL SUMMARY":"summary",
-        "EXPERIENCE":"experience","WORK EXPERIENCE":"experience",
-        "PROFESSIONAL EXPERIENCE":"experience","INTERNSHIPS":"experience",
-        "EDUCATION":"education","ACADEMIC BACKGROUND":"education",
-        "SKILLS":"skills_ai","TECHNICAL SKILLS":"skills_ai",
-        "PROJECTS":"projects","KEY PROJECTS":"projects",
-        "CERTIFICATIONS":"certifications","CERTIFICATES":"certifications",
-        "LANGUAGES":"languages_ai","LANGUAGE":"languages_ai",
-    }
-
-    current_section = None
-    current_entry   = None
-    current_bullets = []
-    summary_lines   = []
-
-    def flush():
-        nonlocal current_entry, current_bullets
-        if current_entry is None: return
-        current_entry["bullets"] = current_bullets[:]
-        if current_section == "experience":   d["experience"].append(current_entry)
-        elif current_section == "education":  d["education"].append(current_entry)
-        elif current_section == "projects":   d["projects"].append(current_entry)
-        current_entry   = None
-        current_bullets = []
-
-    for line in resume_text.split("\n"):
-        s = line.strip()
-        if not s: continue
-
-        # Section header detection
-        key = s.upper().rstrip(":").strip()
-        if key in SECTION_MAP:
-            flush()
-            current_section = SECTION_MAP[key]
-            continue
-
-        if current_section == "summary":
-            summary_lines.append(s)
-
-        elif current_section in ("skills_ai",) and not d["skills"]:
-            # Only use AI skills if form didn't provide them
-            for sk in re.split(r'[,|]', s):
-                sk = sk.strip().lstrip("-* ")
-                if sk: d["skills"].append(sk)
-
-        elif current_section == "experience":
-            if s.startswith("- ") or s.startswith("* "):
-                current_bullets.append(s[2:].strip())
-            elif "|" in s:
-                flush()
-                parts = [p.strip() for p in s.split("|")]
-                date_str = parts[2] if len(parts)>2 else ""
-                date_parts = [x.strip() for x in date_str.split("-")]
-                current_entry = {
-                    "role":    parts[0] if parts else "",
-                    "company": parts[1] if len(parts)>1 else "",
-                    "start":   date_parts[0] if date_parts else "",
-                    "end":     date_parts[1] if len(date_parts)>1 else "",
-                    "location":parts[3] if len(parts)>3 else "",
-                }
-                current_bullets = []
-            else:
-                # Plain line: company then role then date pattern
-                if current_entry is None:
-                    flush()
-                    current_entry = {"company":s,"role":"","start":"","end":"","location":""}
-                    current_bullets = []
-                elif not current_entry.get("role"):
-                    current_entry["role"] = s
-                elif not current_entry.get("start"):
-                    dp = [x.strip() for x in s.split("-")]
-                    current_entry["start"] = dp[0]
-                    current_entry["end"]   = dp[1] if len(dp)>1 else ""
-
-        elif current_section == "education":
-            if "|" in s:
-                flush()
-                parts = [p.strip() for p in s.split("|")]
-                current_entry = {
-                    "degree":      parts[0] if parts else "",
-                    "institution": parts[1] if len(parts)>1 else "",
-                    "year":        parts[2] if len(parts)>2 else "",
-                    "grade":       parts[3] if len(parts)>3 else "",
-                    "location":    parts[4] if len(parts)>4 else "",
-                }
-                current_bullets = []
-                flush()
-            else:
-                if current_entry is None:
-                    current_entry = {"institution":s,"degree":"","year":"","grade":"","location":""}
-                    current_bullets = []
-                elif not current_entry.get("degree"):
-                    current_entry["degree"] = s
-                elif not current_entry.get("year"):
-                    # Check if it's a year/grade line
-                    nums = re.findall(r'[\d.]+', s)
-                    if nums: current_entry["year"] = nums[0]
-                    if len(nums)>1: current_entry["grade"] = nums[1]
-                elif not current_entry.get("location"):
-                    current_entry["location"] = s
-
-        elif current_section == "projects":
-            if s.startswith("- ") or s.startswith("* "):
-                current_bullets.append(s[2:].strip())
-            else:
-                flush()
-                if "|" in s:
-                    parts = [p.strip() for p in s.split("|")]
-                    current_entry = {"name":parts[0],"tech":parts[1] if len(parts)>1 else ""}
-                else:
-                    current_entry = {"name":s,"tech":""}
-                current_bullets = []
-
-        elif current_section == "certifications":
-            cert = s.lstrip("-* ").strip()
-            if cert and cert.upper() not in SECTION_MAP:
-                d["certifications"].append(cert)
-
-        elif current_section == "languages_ai" and not d["languages"]:
-            # Only use if form didn't give us languages
-            for l in re.split(r'[,]', s):
-                l = l.strip().lstrip("-* ")
-                if l and l.upper() not in SECTION_MAP and len(l) < 40:
-                    d["languages"].append(l)
-
-    flush()
-    d["summary"] = " ".join(summary_lines)
-
-    # Fallback: parse education from raw form data
-    if not d["education"] and raw.get("education_entries"):
-        for e in raw.get("education_entries",[]):
-            d["education"].append(e)
-
-    # Fallback: parse experience from raw form data
-    if not d["experience"] and raw.get("experience_entries"):
-        for e in raw.get("experience_entries",[]):
-            d["experience"].append(e)
-
-    return d
-
-
-def parse_output(output):
-    r = output.find("--- RESUME ---")
-    c = output.find("--- COVER LETTER ---")
-    if r!=-1 and c!=-1:
-        return (output[r+len("--- RESUME ---"):c].strip(),
-                output[c+len("--- COVER LETTER ---"):].strip())
-    return output.strip(), output.strip()
-
+# Groq behind the retry / deadline / circuit-breaker layer (llm_gateway.py)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 120))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 20))
+client = LLMGateway(
+    client_factory=lambda: make_client(GROQ_API_KEY, LLM_POOL_SIZE, LLM_TIMEOUT),
+    async_client_factory=lambda: make_async_client(GROQ_API_KEY, LLM_POOL_SIZE, LLM_TIMEOUT),
+    fallback_model=os.getenv("LLM_FALLBACK_MODEL") or None,
+    max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", 3)),
+    deadline=LLM_TIMEOUT,
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", 5)),
+    cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", 30)),
+)
+
+# History backend (SQLite by default, see history_store.py), opened on first use
+store = LazyStore()
+HISTORY_PAGE_MAX = 200
+
+LLM_MODEL      = "llama-3.3-70b-versatile"
+LLM_MAX_TOKENS = 2000   # ceiling; prompt_budget sizes each request below it
+# USD per million tokens, for the cost counter at /metrics
+LLM_PRICE_IN   = float(os.getenv("LLM_PRICE_IN", 0.59))
+LLM_PRICE_OUT  = float(os.getenv("LLM_PRICE_OUT", 0.79))
+# Identical (model, system prompt, prompt, max_tokens) → cached completion
+llm_cache = open_llm_cache()
+
+# LLM_JSON_MODE=1 (or "json_mode": true per request) asks for a JSON object
+# instead of free text; see resume_schema.py
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "0") == "1"
+
+# Per-client token buckets + model-call ceiling (ratelimit.py); RATE_LIMIT=0 disables
+limiter = open_limiter()
+RATE_LIMIT_EXEMPT = {"static", "prometheus_metrics"}
+
+# PDF rendering in warm worker processes (PDF_POOL_WORKERS=0 renders inline).
+# Serverless runtimes have no POSIX semaphores for a process pool.
+SERVERLESS = bool(os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+pdf_pool = PDFRenderPool(
+    workers=int(os.getenv("PDF_POOL_WORKERS", 0 if SERVERLESS else min(os.cpu_count() or 1, 4))),
+    max_pending=int(os.getenv("PDF_POOL_MAX_PENDING", 64)),
+    timeout=float(os.getenv("PDF_TIMEOUT", 30)),
+)
+# Rendered PDFs keyed by a hash of what they are drawn from
+pdf_cache = open_pdf_cache()
 
 SYSTEM_PROMPT = """You are a professional resume writer. Follow this exact format:
 
@@ -529,112 +137,739 @@ def home():
 def history():
     return render_template("history.html")
 
+# ─────────────────────────────────────────────────────────────
+#  GENERATION HELPERS (shared by /generate and /generate/stream)
+# ─────────────────────────────────────────────────────────────
+def build_prompt(data, as_json=False):
+    if as_json:
+        return resume_schema.user_prompt(data)
+    full_prompt = data.get("full_prompt")
+    if not full_prompt:
+        name       = data.get("name","Candidate")
+        job_title  = data.get("job_title","")
+        skills     = data.get("skills","")
+        experience = data.get("experience","")
+        education  = data.get("education","")
+        job_desc   = data.get("job_desc","")
+        jd = f"\nTailor to:\n{job_desc}" if job_desc.strip() else ""
+        full_prompt = (f"Create RESUME and COVER LETTER.\nName: {name}\n"
+                       f"Job: {job_title}\nSkills: {skills}\n"
+                       f"Experience: {experience}\nEducation: {education}{jd}\n"
+                       f"Start with --- RESUME ---")
+    return full_prompt
+
+def prepare_prompt(data):
+    """Build the prompt, fit it to the token budget and size max_tokens.
+
+    Returns ``(full_prompt, max_tokens)``; estimated counts are logged."""
+    as_json = json_mode(data)
+    full_prompt, max_tokens, stats = prompt_budget.plan(
+        data, build_prompt(data, as_json), system_prompt(as_json), as_json, LLM_MAX_TOKENS)
+    app.logger.info("prompt ~%d tokens (system %d, job_desc %d -> %d), max_tokens %d",
+                    stats["prompt_tokens"], stats["system_tokens"],
+                    stats["job_desc_tokens"], stats["job_desc_compressed_tokens"],
+                    max_tokens)
+    return full_prompt, max_tokens
+
+def json_mode(data):
+    return bool(data.get("json_mode", LLM_JSON_MODE))
+
+def system_prompt(as_json=False):
+    return resume_schema.SYSTEM_PROMPT if as_json else SYSTEM_PROMPT
+
+def llm_messages(full_prompt, as_json=False, system=None):
+    return [{"role":"system","content":system or system_prompt(as_json)},
+            {"role":"user",  "content":full_prompt}]
+
+# ─── model calls as generators ───
+# Pipelines that call the model are generators: they yield the kwargs of each
+# completion and are sent its response (or have its error thrown in). drive()
+# runs one on the calling thread; asgi.py runs the same code with the calls
+# awaited on an event loop, so no thread waits on Groq.
+def step(steps, response=None, error=None):
+    """Advance ``steps``: ``(kwargs, None)`` for its next model call, or
+    ``(None, result)`` once it returns."""
+    try:
+        return (steps.throw(error) if error else steps.send(response)), None
+    except StopIteration as stop:
+        return None, stop.value
+
+def drive(steps):
+    """Run a model-call generator to its result with blocking Groq calls."""
+    kwargs, result = step(steps)
+    while kwargs is not None:
+        try:
+            response = client.chat.completions.create(**kwargs)
+        except Exception as e:
+            kwargs, result = step(steps, error=e)
+        else:
+            kwargs, result = step(steps, response)
+    return result
+
+def completion(full_prompt, as_json=False, max_tokens=LLM_MAX_TOKENS, system=None):
+    """One non-streaming completion (a model-call generator); returns its text.
+
+    A reply cut off at ``max_tokens`` is retried once at LLM_MAX_TOKENS;
+    cut off there too, it raises OutputTruncated and is never cached."""
+    kwargs = dict(model=LLM_MODEL, messages=llm_messages(full_prompt, as_json, system),
+                  max_tokens=max_tokens)
+    if as_json:
+        kwargs["response_format"] = {"type":"json_object"}
+    with llm_admission():
+        while True:
+            with span("llm"):
+                response = yield kwargs
+            choice = response.choices[0]
+            count_usage(response, full_prompt, choice.message.content, system)
+            if getattr(choice, "finish_reason", None) != "length":
+                return choice.message.content
+            if kwargs["max_tokens"] >= LLM_MAX_TOKENS:
+                raise prompt_budget.OutputTruncated(
+                    f"Model output was cut off at {kwargs['max_tokens']} tokens")
+            app.logger.warning("Completion hit max_tokens=%d, retrying at %d",
+                               kwargs["max_tokens"], LLM_MAX_TOKENS)
+            kwargs["max_tokens"] = LLM_MAX_TOKENS
+
+def complete(full_prompt, as_json=False, max_tokens=LLM_MAX_TOKENS, system=None):
+    return drive(completion(full_prompt, as_json, max_tokens, system))
+
+# ─── admission control ───
+def key_id(key):
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+# Comma-separated keys that get buckets of their own. Any other key is
+# limited by IP, so a client cannot mint fresh buckets with made-up keys.
+API_KEYS = {key_id(k.strip()) for k in os.getenv("API_KEYS","").split(",") if k.strip()}
+
+def client_id():
+    """Rate-limit identity: a known API key if one is sent, else the client IP."""
+    key = request.headers.get("X-API-Key") or \
+          request.headers.get("Authorization","").removeprefix("Bearer ").strip()
+    if key and key_id(key) in API_KEYS:
+        return "key:" + key_id(key)
+    return "ip:" + (request.remote_addr or "unknown")
+
+def admit_llm():
+    """Charge this client's model-call bucket and take a model slot, once
+    per request; the slot is released when the response closes. Outside a
+    request (jobs, batches) just wait for a slot."""
+    if not has_request_context():
+        limiter.acquire(block=True)
+        return limiter.release
+    if g.get("llm_admitted"):
+        return None
+    limiter.check(client_id(), "llm")
+    g.llm_admitted = True
+    if g.get("llm_on_loop"):
+        # asgi.py: the call waits on the event loop, not on a worker thread,
+        # and AsyncLLMRunner bounds it instead of the model-call lane.
+        return lambda: None
+    limiter.acquire()
+    return limiter.release
+
+@contextmanager
+def llm_admission():
+    if limiter is None:
+        yield; return
+    release = admit_llm()
+    if release is None:
+        yield; return
+    try:
+        yield
+    finally:
+        release()
+        if has_request_context():
+            g.llm_admitted = False
+
+@app.before_request
+def admit_request():
+    if limiter is not None and request.endpoint not in RATE_LIMIT_EXEMPT:
+        limiter.check(client_id(), "req")
+
+@app.errorhandler(RateLimited)
+def rate_limited(e):
+    metrics.rate_limited.inc(1, e.reason)
+    return jsonify({"error":str(e)}),429,{"Retry-After":str(math.ceil(e.retry_after))}
+
+def count_usage(response, full_prompt, output, system=None):
+    """Token/cost counters; estimated locally when Groq sends no usage."""
+    usage = getattr(response, "usage", None) or \
+            getattr(getattr(response, "x_groq", None), "usage", None)
+    if usage is not None:
+        prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+    else:
+        prompt_tokens = prompt_budget.estimate_tokens((system or SYSTEM_PROMPT) + full_prompt)
+        completion_tokens = prompt_budget.estimate_tokens(output)
+    metrics.record_usage(getattr(response, "model", None) or LLM_MODEL,
+                         prompt_tokens, completion_tokens, LLM_PRICE_IN, LLM_PRICE_OUT)
+
+def read_payload():
+    data = request.json
+    # "no_cache": true (or Cache-Control: no-cache) forces a fresh
+    # completion; the fresh result still replaces the cached one.
+    if "no-cache" in request.headers.get("Cache-Control",""):
+        data["no_cache"] = True
+    return data
+
+def cache_lookup(data, full_prompt, max_tokens):
+    """Return (cache_key, cached_output_or_None) for this payload."""
+    cache_key = llm_cache.key(LLM_MODEL, system_prompt(json_mode(data)),
+                              full_prompt, max_tokens)
+    return cache_key, (None if data.get("no_cache") else llm_cache.get(cache_key))
+
+def record_raw(data):
+    return {
+        "name":     data.get("name","Candidate"),
+        "job_title":data.get("job_title",""),
+        "email":    data.get("email",""),
+        "phone":    data.get("phone",""),
+        "linkedin": data.get("linkedin",""),
+        "location": data.get("location",""),
+        "skills":   data.get("skills",""),
+        "languages":data.get("languages",""),
+        "experience_entries": data.get("experience_entries",[]),
+        "education_entries":  data.get("education_entries",[]),
+    }
+
+def structure_text(output, raw):
+    with span("parse"):
+        resume_text, _ = parse_output(output)
+        return parse_structured(resume_text, raw)
+
+def make_record(data, output, structured=None, parser_version=PARSER_VERSION):
+    """History record; the structured resume is parsed here once, unless
+    the caller already has it (streamed or JSON-mode output)."""
+    raw = record_raw(data)
+    if structured is None:
+        structured = structure_text(output, raw)
+    return {
+        "id": str(uuid.uuid4())[:8], "name":raw["name"],
+        "job_title":raw["job_title"], "template":data.get("template","modern"),
+        "output":output,
+        "raw": raw,
+        "structured": structured,
+        "parser_version": parser_version,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")
+    }
+
+def record_structured(record):
+    """Stored structured resume, re-parsed (and saved) if the parser changed.
+
+    JSON-mode records came from the model, not the parser, and never go stale."""
+    version = record.get("parser_version")
+    if "structured" in record and version in (PARSER_VERSION, "json"):
+        return record["structured"]
+    structured = structure_text(record.get("output",""), record.get("raw",{}))
+    record.update(structured=structured, parser_version=PARSER_VERSION)
+    try:
+        store.update(record["id"], structured=structured, parser_version=PARSER_VERSION)
+    except Exception:
+        app.logger.exception("Could not update history record %s", record["id"])
+    return structured
+
+def save_record(record):
+    try:
+        with span("history_save"):
+            store.insert(record)
+    except Exception:
+        app.logger.exception("Could not save history record %s", record["id"])
+
+def generation(data):
+    """Full generate pipeline, prompt → model → record, as a model-call
+    generator; returns ``(record, cached)``."""
+    with span("prompt"):
+        full_prompt, max_tokens = prepare_prompt(data)
+    as_json = json_mode(data)
+    with span("llm_cache"):
+        cache_key, output = cache_lookup(data, full_prompt, max_tokens)
+    cached = output is not None
+    if not cached:
+        output = yield from completion(full_prompt, as_json, max_tokens)
+    structured = None
+    if as_json:
+        # Validate before caching so a malformed answer is not replayed.
+        with span("parse"):
+            structured, cover = resume_schema.from_model(output, record_raw(data))
+    if not cached:
+        llm_cache.set(cache_key, output)
+    if as_json:
+        output = resume_schema.to_text(structured, cover)
+    record = make_record(data, output, structured, "json" if as_json else PARSER_VERSION)
+    save_record(record)
+    return record, cached
+
+def run_generation(data):
+    return drive(generation(data))
+
+def sse(payload, event=None):
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(payload)}\n\n"
+
+
+def llm_failed(e):
+    """JSON error response for a failed model call."""
+    if isinstance(e, RateLimited):
+        return rate_limited(e)
+    if isinstance(e, Overloaded):
+        return jsonify({"error": str(e)}), 503, {"Retry-After":"5"}
+    if isinstance(e, CircuitOpen):
+        return jsonify({"error": str(e)}), 503, {"Retry-After":str(int(e.retry_after)+1)}
+    from groq import APIStatusError, APITimeoutError, RateLimitError
+    if isinstance(e, RateLimitError):
+        return jsonify({"error": "Model rate limit, retry shortly"}), 429, \
+               {"Retry-After":e.response.headers.get("retry-after","10")}
+    if isinstance(e, APITimeoutError):
+        return jsonify({"error": "Model timed out"}), 504
+    if isinstance(e, APIStatusError):
+        # 5xx that outlasted the gateway's retries; 4xx are our own fault.
+        return jsonify({"error": str(e)}), 502 if e.status_code >= 500 else 500
+    if isinstance(e, resume_schema.SchemaError):
+        return jsonify({"error": f"Malformed model output: {e}"}), 502
+    if isinstance(e, prompt_budget.OutputTruncated):
+        return jsonify({"error": str(e)}), 502
+    import traceback; traceback.print_exc()
+    return jsonify({"error": str(e)}), 500
+
+
+def generate_steps():
+    """The /generate view as a model-call generator (asgi.py runs it on the
+    event loop)."""
+    try:
+        record, cached = yield from generation(read_payload())
+        with span("serialize"):
+            return jsonify({"output":record["output"],"id":record["id"],"cached":cached,
+                            "structured":record["structured"]})
+    except Exception as e:
+        return llm_failed(e)
+
 @app.route("/generate", methods=["POST"])
 def generate():
+    return drive(generate_steps())
+
+@app.route("/records/<rid>/regenerate", methods=["POST"])
+def regenerate_section(rid):
+    """Rewrite one section of a stored record (see section_edit.py).
+
+    Body: {"section": "summary"|"experience"|"projects"|"cover",
+           "index": n (experience only), "instructions": "...", "job_desc": "..."}
+    The record's output and structured resume are updated in place and
+    returned. Edits skip the LLM cache: asking again means a new take."""
+    data=request.json or {}
+    target, index = data.get("section"), data.get("index")
+    record=store.get(rid)
+    if record is None:
+        return jsonify({"error":"Record not found"}),404
     try:
-        data        = request.json
-        name        = data.get("name","Candidate")
-        job_title   = data.get("job_title","")
-        template    = data.get("template","modern")
-        full_prompt = data.get("full_prompt")
-
-        if not full_prompt:
-            skills     = data.get("skills","")
-            experience = data.get("experience","")
-            education  = data.get("education","")
-            job_desc   = data.get("job_desc","")
-            jd = f"\nTailor to:\n{job_desc}" if job_desc.strip() else ""
-            full_prompt = (f"Create RESUME and COVER LETTER.\nName: {name}\n"
-                           f"Job: {job_title}\nSkills: {skills}\n"
-                           f"Experience: {experience}\nEducation: {education}{jd}\n"
-                           f"Start with --- RESUME ---")
-
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role":"system","content":SYSTEM_PROMPT},
-                {"role":"user",  "content":full_prompt}
-            ],
-            max_tokens=2000
-        )
-        output = response.choices[0].message.content
-
-        record = {
-            "id": str(uuid.uuid4())[:8], "name":name,
-            "job_title":job_title, "template":template,
-            "output":output,
-            "raw": {
-                "name":name, "job_title":job_title,
-                "email":    data.get("email",""),
-                "phone":    data.get("phone",""),
-                "linkedin": data.get("linkedin",""),
-                "location": data.get("location",""),
-                "skills":   data.get("skills",""),
-                "languages":data.get("languages",""),
-                "experience_entries": data.get("experience_entries",[]),
-                "education_entries":  data.get("education_entries",[]),
-            },
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")
-        }
-        try:
-            db=load_db(); db.insert(0,record); save_db(db)
-        except:
-            pass
-        return jsonify({"output":output,"id":record["id"]})
+        structured=record_structured(record)
+        system, prompt, max_tokens = section_edit.build(
+            target, record, structured, index,
+            data.get("instructions") or "", data.get("job_desc") or "")
+    except section_edit.EditError as e:
+        return jsonify({"error":str(e)}),400
+    try:
+        # Don't spend a model call on an edit that could not be spliced in.
+        section_edit.check_splice(record.get("output",""), target, index)
+    except section_edit.EditError as e:
+        return jsonify({"error":str(e)}),409
+    try:
+        reply=section_edit.clean_reply(complete(prompt, max_tokens=max_tokens, system=system))
     except Exception as e:
-        import traceback; traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return llm_failed(e)
+    try:
+        output=section_edit.splice(record.get("output",""), target, reply, index)
+    except section_edit.EditError as e:
+        return jsonify({"error":str(e)}),409
+    structured=structure_text(output, record.get("raw",{}))
+    edited_at=datetime.now().strftime("%Y-%m-%d %H:%M")
+    with span("history_save"):
+        store.update(rid, output=output, structured=structured,
+                     parser_version=PARSER_VERSION, edited_at=edited_at)
+    return jsonify({"id":rid,"section":target,"index":index,"text":reply,
+                    "output":output,"structured":structured,"edited_at":edited_at})
+
+@app.route("/generate/stream", methods=["POST"])
+def generate_stream():
+    """Same as /generate, but forwards tokens as server-sent events:
+    ``data: {"delta": ...}`` per chunk, then ``event: done`` carrying the
+    record id and the structured resume (or ``event: error``).
+
+    The resume is parsed as it streams: ``event: section`` / ``entry`` /
+    ``item`` frames (see ``resume_parser``) follow the delta that completed
+    them. JSON-mode output cannot be shown token by token, so it arrives as
+    one delta once the completion has been validated."""
+    data = read_payload()
+    with span("prompt"):
+        full_prompt, max_tokens = prepare_prompt(data)
+    with span("llm_cache"):
+        cache_key, cached_output = cache_lookup(data, full_prompt, max_tokens)
+    # Refuse before any headers go out; the model slot is held until the
+    # stream closes.
+    release = admit_llm() if cached_output is None and limiter is not None else None
+
+    def json_events():
+        try:
+            record, cached = run_generation(data)
+            yield sse({"delta":record["output"]})
+            yield sse({"id":record["id"],"cached":cached,
+                       "structured":record["structured"]}, "done")
+        except Exception as e:
+            import traceback; traceback.print_exc()
+            yield sse({"error":str(e)}, "error")
+
+    def events():
+        parser = OutputParser(record_raw(data))
+        try:
+            if cached_output is not None:
+                output = cached_output
+                yield sse({"delta":output})
+                for ev in parser.feed(output):
+                    yield sse(ev, ev["type"])
+            else:
+                parts, chunk, finish = [], None, None
+                t0 = time.perf_counter()
+                stream = client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=llm_messages(full_prompt),
+                    max_tokens=max_tokens,
+                    stream=True
+                )
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if chunk.choices and chunk.choices[0].finish_reason:
+                        finish = chunk.choices[0].finish_reason
+                    if delta:
+                        parts.append(delta)
+                        yield sse({"delta":delta})
+                        for ev in parser.feed(delta):
+                            yield sse(ev, ev["type"])
+                output = "".join(parts)
+                # Headers are long gone by now: histograms only.
+                metrics.stage_seconds.observe(time.perf_counter() - t0, "llm")
+                count_usage(chunk, full_prompt, output)   # usage rides the last chunk
+                if finish == "length":
+                    # Already on screen, but not cached or saved as a record.
+                    raise prompt_budget.OutputTruncated(
+                        f"Model output was cut off at {max_tokens} tokens")
+                llm_cache.set(cache_key, output)
+
+            structured = parser.close(output)
+            for ev in parser.drain():
+                yield sse(ev, ev["type"])
+            record = make_record(data, output, structured)
+            save_record(record)
+            yield sse({"id":record["id"],"cached":cached_output is not None,
+                       "structured":structured}, "done")
+        except Exception as e:
+            import traceback; traceback.print_exc()
+            yield sse({"error":str(e)}, "error")
+
+    stream = json_events() if json_mode(data) else events()
+    resp = Response(stream_with_context(stream), mimetype="text/event-stream",
+                    headers={"Cache-Control":"no-cache","X-Accel-Buffering":"no"})
+    if release is not None:
+        resp.call_on_close(release)
+    return resp
+
+# ─────────────────────────────────────────────────────────────
+#  BACKGROUND JOBS — POST /jobs, then poll GET /jobs/<id>
+# ─────────────────────────────────────────────────────────────
+def run_job(data):
+    record, cached = run_generation(data)
+    resume_text, cover_text = parse_output(record["output"])
+    return {"record_id":record["id"], "cached":cached,
+            "resume":resume_text, "cover_letter":cover_text}
+
+def is_retryable(e):
+    from groq import APIStatusError, RateLimitError
+    return isinstance(e, (RateLimitError, CircuitOpen)) or \
+           (isinstance(e, APIStatusError) and e.status_code >= 500)
+
+job_queue = JobQueue(
+    run_job, lambda: JobStore(writable_path(os.getenv("JOBS_DB", "jobs.sqlite3")),
+                              stale_after=float(os.getenv("JOB_STALE_SECONDS", 900))),
+    workers=int(os.getenv("JOB_WORKERS", 4)),
+    max_queue=int(os.getenv("JOB_MAX_QUEUE", 100)),
+    retryable=is_retryable,
+)
+
+@app.route("/jobs", methods=["POST"])
+def create_job():
+    data = read_payload()
+    callback_url = data.pop("callback_url", None)
+    if callback_url:
+        try:
+            check_callback(callback_url)
+        except ValueError as e:
+            return jsonify({"error":str(e)}),400
+    if limiter is not None:
+        # Jobs run later on a worker thread; the client pays when queueing.
+        limiter.check(client_id(), "llm")
+    try:
+        job_id = job_queue.submit(data, callback_url)
+    except QueueFull:
+        return jsonify({"error":"Too many queued jobs"}),503,{"Retry-After":"10"}
+    return jsonify({"job_id":job_id,"status":"queued",
+                    "status_url":f"/jobs/{job_id}"}),202
+
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    job = job_queue.store.get(job_id)
+    return jsonify(job) if job else (jsonify({"error":"Not found"}),404)
+
+# ─────────────────────────────────────────────────────────────
+#  BATCH — JSONL/CSV of candidates in, streamed ZIP of PDFs out
+# ─────────────────────────────────────────────────────────────
+BATCH_MAX_ITEMS       = int(os.getenv("BATCH_MAX_ITEMS", 200))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+
+@app.route("/batch", methods=["POST"])
+def batch():
+    fmt = request.args.get("format") or \
+          ("csv" if "csv" in (request.content_type or "") else "jsonl")
+    try:
+        items = parse_items(request.get_data(), fmt)
+    except BatchError as e:
+        return jsonify({"error":str(e)}),400
+    if not items:
+        return jsonify({"error":"No candidates in batch"}),400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({"error":f"At most {BATCH_MAX_ITEMS} candidates per batch"}),413
+    try:
+        concurrency = min(max(int(request.args.get("concurrency", 4)), 1),
+                          BATCH_MAX_CONCURRENCY)
+    except ValueError:
+        return jsonify({"error":"Bad concurrency"}),400
+    if "no-cache" in request.headers.get("Cache-Control",""):
+        for it in items: it["no_cache"] = True
+    if limiter is not None:
+        # Charged up front, but at most one burst: a batch is bounded by
+        # BATCH_MAX_ITEMS, and its calls queue for model slots as they run.
+        limiter.check(client_id(), "llm", min(len(items), limiter.burst("llm")))
+
+    generate_one = lambda item: run_generation(item)[0]
+    return Response(stream_zip(items, generate_one, pdf_pool, concurrency),
+                    mimetype="application/zip",
+                    headers={"Content-Disposition":"attachment; filename=resumes_batch.zip",
+                             "X-Batch-Items":str(len(items))})
 
 @app.route("/api/history")
 def api_history():
-    db=load_db()
-    return jsonify([{"id":r["id"],"name":r["name"],"job_title":r["job_title"],
-                     "template":r["template"],"created_at":r["created_at"]} for r in db])
+    # ?limit=&cursor= pages through summaries only; bodies stay on disk.
+    try:
+        limit = min(max(int(request.args.get("limit", 50)), 1), HISTORY_PAGE_MAX)
+        filters = {k: request.args[k] for k in FILTER_FIELDS if request.args.get(k)}
+        items, next_cursor = store.list_summaries(limit, request.args.get("cursor"), filters)
+    except ValueError:
+        return jsonify({"error":"Bad limit or cursor"}),400
+    return jsonify({"items":items,"next_cursor":next_cursor})
 
 @app.route("/api/history/<rid>")
 def api_history_detail(rid):
-    db=load_db()
-    r=next((x for x in db if x["id"]==rid),None)
+    r=store.get(rid)
     return jsonify(r) if r else (jsonify({"error":"Not found"}),404)
 
 @app.route("/api/history/<rid>", methods=["DELETE"])
 def delete_record(rid):
-    db=load_db(); save_db([r for r in db if r["id"]!=rid])
+    store.delete(rid)
     return jsonify({"success":True})
 
+@app.route("/api/llm-cache")
+def api_llm_cache():
+    return jsonify(llm_cache.stats())
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/llm-gateway")
+def api_llm_gateway():
+    return jsonify(client.stats())
+
+@app.route("/api/limits")
+def api_limits():
+    return jsonify(limiter.stats() if limiter else {"enabled":False})
+
+def render_cached(key, fn, args, stage="pdf"):
+    """Bytes for ``key``, rendering ``fn(*args)`` in the pool only on a miss.
+    Raises PoolBusy / FutureTimeout like the pool does."""
+    with span(stage+"_cache"):
+        data = pdf_cache.get(key)
+    if data is None:
+        with span(stage+"_render"):
+            data = pdf_pool.render(fn, *args)
+        pdf_cache.set(key, data)
+    return data
+
+def render_failed(e):
+    if isinstance(e, PoolBusy):
+        return "PDF renderer busy, retry shortly",503,{"Retry-After":"2"}
+    if isinstance(e, FutureTimeout):
+        return "PDF rendering timed out",504
+    if isinstance(e, BrokenExecutor):
+        return "PDF renderer restarting, retry shortly",503,{"Retry-After":"2"}
+    import traceback; traceback.print_exc()
+    return f"PDF error: {e}",500
+
+def revalidate(resp, etag):
+    """``private, no-cache`` plus a strong ETag. Records get edited and
+    deleted and carry personal data, so shared caches must not keep them
+    and browsers must ask every time; an unchanged file costs a 304."""
+    resp.set_etag(etag)
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
+
+def file_response(key, fn, args, filename, mimetype="application/pdf"):
+    """Serve the file for ``key``, rendering ``fn(*args)`` only on a miss.
+
+    The key doubles as the ETag, so a client that already holds this exact
+    file gets a 304 without any lookup or rendering."""
+    etag = key[:32]
+    if request.if_none_match.contains(etag):
+        return revalidate(Response(status=304), etag)
+    try:
+        data = render_cached(key, fn, args,
+                             "pdf" if mimetype == "application/pdf" else "export")
+    except Exception as e:
+        return render_failed(e)
+    with span("send"):
+        resp = send_file(io.BytesIO(data),as_attachment=True,
+                         download_name=filename,mimetype=mimetype)
+    return revalidate(resp, etag)
+
+def safe_name(name):
+    return re.sub(r'\s+','_',name or "Candidate")
+
+# Everything a stored record can be downloaded as; PDFs come from pdf_builder.
+EXPORT_FORMATS = ("pdf",) + tuple(exporters.FORMATS)
+EXPORT_DOCS    = ("resume", "cover")
+
+def resume_file(structured, name, fmt="pdf", template=None):
+    """(cache key, renderer, args, filename, mimetype) for a resume."""
+    template=pdf_templates.get(template).name
+    filename=f"{safe_name(name)}_Resume.{fmt}"
+    if fmt=="pdf":
+        return (content_key("resume",LAYOUT_VERSION,template,structured),
+                "pdf_builder:render_resume_data",(structured,template),filename,
+                "application/pdf")
+    return (content_key("resume",fmt,exporters.EXPORT_VERSION,template,structured),
+            "exporters:render_resume",(fmt,structured,template),filename,
+            exporters.FORMATS[fmt].mime)
+
+def cover_file(output, name, job_title, fmt="pdf"):
+    filename=f"{safe_name(name)}_Cover_Letter.{fmt}"
+    if fmt=="pdf":
+        return (content_key("cover",LAYOUT_VERSION,name,job_title,output),
+                "pdf_builder:render_cover",(output,name,job_title),filename,
+                "application/pdf")
+    return (content_key("cover",fmt,exporters.EXPORT_VERSION,name,job_title,output),
+            "exporters:render_cover",(fmt,output,name,job_title),filename,
+            exporters.FORMATS[fmt].mime)
+
+def record_file(record, doc, fmt, template=None):
+    if doc=="cover":
+        return cover_file(record.get("output",""),record.get("name","Candidate"),
+                          record.get("job_title",""),fmt)
+    return resume_file(record_structured(record),record.get("name"),fmt,
+                       template or record.get("template"))
+
+def resume_pdf(structured, name, template=None):
+    return file_response(*resume_file(structured,name,"pdf",template))
+
+def cover_pdf(output, name, job_title):
+    return file_response(*cover_file(output,name,job_title,"pdf"))
+
+@app.route("/records/<rid>/<any(resume, cover):doc>.<fmt>")
+def record_export(rid, doc, fmt):
+    # resume.pdf, cover.docx, resume.txt, ... (?template= for resumes)
+    if fmt not in EXPORT_FORMATS:
+        return f"Unknown format: {fmt}",404
+    record=store.get(rid)
+    if record is None:
+        return "Record not found",404
+    try:
+        spec=record_file(record,doc,fmt,request.args.get("template"))
+    except Exception as e:
+        import traceback; traceback.print_exc()
+        return f"Export error: {e}",500
+    return file_response(*spec)
+
+@app.route("/records/<rid>/export.zip")
+def record_bundle(rid):
+    """Several formats of a record in one ZIP, e.g.
+    ?formats=pdf,docx,txt&docs=resume,cover&template=classic (defaults: all).
+    Each file comes from the per-format cache, so only missing ones render."""
+    formats=[f for f in request.args.get("formats",",".join(EXPORT_FORMATS)).split(",") if f]
+    docs=[d for d in request.args.get("docs",",".join(EXPORT_DOCS)).split(",") if d]
+    bad=[f for f in formats if f not in EXPORT_FORMATS]+[d for d in docs if d not in EXPORT_DOCS]
+    if bad or not formats or not docs:
+        return f"Unknown formats or docs: {', '.join(bad) or '(none given)'}",400
+    record=store.get(rid)
+    if record is None:
+        return "Record not found",404
+    try:
+        specs=[record_file(record,d,f,request.args.get("template"))
+               for d in docs for f in formats]
+    except Exception as e:
+        import traceback; traceback.print_exc()
+        return f"Export error: {e}",500
+    # The bundle is fully determined by its files' keys.
+    etag=content_key("bundle",[s[0] for s in specs])[:32]
+    if request.if_none_match.contains(etag):
+        return revalidate(Response(status=304),etag)
+    try:
+        files=[(s[3],render_cached(s[0],s[1],s[2],
+                                   "pdf" if s[4]=="application/pdf" else "export"))
+               for s in specs]
+    except Exception as e:
+        return render_failed(e)
+    with span("bundle"):
+        data=exporters.zip_bytes(files)
+    resp=send_file(io.BytesIO(data),as_attachment=True,mimetype="application/zip",
+                   download_name=f"{safe_name(record.get('name'))}_Export.zip")
+    return revalidate(resp,etag)
+
+def download_record(data):
+    """The stored record named by ``data["id"]``, or None. Clients that
+    also post the content still get a PDF if the id is unknown."""
+    rid = data.get("id")
+    return store.get(rid) if rid else None
+
 @app.route("/download-resume-pdf", methods=["POST"])
 def download_resume_pdf():
+    # Body: {"id": record_id} renders the stored structure; otherwise
+    # {"output", "raw", "name"} or a JSON-mode {"structured"} as before.
+    # Prefer GET /records/<id>/resume.pdf for stored records.
     data=request.json
-    output=data.get("output","")
-    raw=data.get("raw",{})
-    name=data.get("name","Candidate")
-    resume_text,_=parse_output(output)
+    record=download_record(data)
+    if record is None and not data.get("output") and not data.get("structured"):
+        return "Record not found",404
+    name=(record or data).get("name","Candidate")
+    template=data.get("template") or (record or {}).get("template")
     try:
-        structured=parse_structured(resume_text,raw)
-        buf=build_resume_pdf(structured)
-        safe=re.sub(r'\s+','_',name)
-        return send_file(buf,as_attachment=True,
-                         download_name=f"{safe}_Resume.pdf",
-                         mimetype="application/pdf")
+        if record is not None:
+            structured=record_structured(record)
+        # JSON-mode clients send back the structured dict from /generate.
+        elif data.get("structured") is not None:
+            structured=resume_schema.validate(data["structured"])
+        else:
+            structured=structure_text(data.get("output",""),data.get("raw",{}))
+    except resume_schema.SchemaError as e:
+        return f"Bad structured resume: {e}",400
     except Exception as e:
         import traceback; traceback.print_exc()
         return f"PDF error: {e}",500
+    return resume_pdf(structured,name,template)
 
 @app.route("/download-cover-pdf", methods=["POST"])
 def download_cover_pdf():
     data=request.json
-    output=data.get("output","")
-    name=data.get("name","Candidate")
-    job_title=data.get("job_title","")
-    _,cover_text=parse_output(output)
-    try:
-        buf=build_cover_pdf(name,job_title,cover_text)
-        safe=re.sub(r'\s+','_',name)
-        return send_file(buf,as_attachment=True,
-                         download_name=f"{safe}_Cover_Letter.pdf",
-                         mimetype="application/pdf")
-    except Exception as e:
-        return f"PDF error: {e}",500
+    record=download_record(data)
+    if record is None and not data.get("output"):
+        return "Record not found",404
+    src=record or data
+    return cover_pdf(src.get("output",""),src.get("name","Candidate"),
+                     src.get("job_title",""))
 
 if __name__=="__main__":
     app.run(debug=True)
\ No newline at end of file
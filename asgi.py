@@ -0,0 +1,124 @@
+"""ASGI entry point, for running many generations per box:
+
+    uvicorn asgi:application --workers 4
+
+POST /generate runs on the event loop. The view is the same code as under
+WSGI (``app.generate_steps``): the parts before and after the model call
+(rate limits, prompt, cache, parse, history) take a short thread hop each,
+and the Groq call itself is awaited through ``AsyncLLMRunner``, so an
+in-flight generation holds a coroutine rather than a worker thread.
+LLM_MAX_CONCURRENCY calls run at once and LLM_MAX_QUEUE more may wait;
+beyond that /generate answers 503. The per-process model-call lane
+(LLM_MAX_INFLIGHT, see ratelimit.py) does not apply to these calls; the
+per-client buckets do.
+
+Every other route is the Flask app through asgiref's ``WsgiToAsgi``, on its
+thread pool; PDFs still render in the PDF worker processes. api/index.py
+(Vercel) and ``gunicorn app:app`` stay WSGI.
+"""
+import io, os, sys, asyncio
+from asgiref.wsgi import WsgiToAsgi
+from flask import g
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+import app as flask_app
+from llm_async import AsyncLLMRunner
+
+runner = AsyncLLMRunner(
+    flask_app.client.acreate,
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 32)),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", 256)),
+)
+wsgi = WsgiToAsgi(flask_app.app)
+
+
+def wsgi_environ(scope, body):
+    """The WSGI environ Flask would have been given for this request."""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "SERVER_NAME": server[0], "SERVER_PORT": str(server[1]),
+        "REMOTE_ADDR": (scope.get("client") or ("",))[0],
+        "wsgi.version": (1, 0), "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body), "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True, "wsgi.multiprocess": True, "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        key = name if name in ("CONTENT_TYPE", "CONTENT_LENGTH") else "HTTP_" + name
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    if flask_app.TRUSTED_PROXIES:
+        # Same client IP as the WSGI stack sees; ProxyFix rewrites in place.
+        ProxyFix(lambda env, start: None, x_for=flask_app.TRUSTED_PROXIES)(environ, None)
+    return environ
+
+
+async def read_body(receive):
+    """The request body, or None if the client went away first."""
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+async def drive(steps):
+    """``app.drive`` with the model calls awaited on this loop."""
+    kwargs, result = await asyncio.to_thread(flask_app.step, steps)
+    while kwargs is not None:
+        try:
+            response = await runner.run(**kwargs)
+        except Exception as e:
+            kwargs, result = await asyncio.to_thread(flask_app.step, steps, error=e)
+        else:
+            kwargs, result = await asyncio.to_thread(flask_app.step, steps, response)
+    return result
+
+
+async def generate(scope, receive, send):
+    body = await read_body(receive)
+    if body is None:
+        return
+    app = flask_app.app
+    # The request context lives in this task's contextvars; to_thread copies
+    # them, so every hop sees the same request and g.
+    with app.request_context(wsgi_environ(scope, body)):
+        g.llm_on_loop = True
+        try:
+            rv = await asyncio.to_thread(app.preprocess_request)
+            if rv is None:
+                rv = await drive(flask_app.generate_steps())
+        except Exception as e:
+            rv = await asyncio.to_thread(app.handle_user_exception, e)
+        resp = await asyncio.to_thread(app.finalize_request, rv)
+    await send({"type": "http.response.start", "status": resp.status_code,
+                "headers": [(k.lower().encode("latin-1"), v.encode("latin-1"))
+                            for k, v in resp.headers.items()]})
+    await send({"type": "http.response.body", "body": resp.get_data()})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http" and scope["method"] == "POST" and \
+            scope["path"] == scope.get("root_path", "") + "/generate":
+        return await generate(scope, receive, send)
+    return await wsgi(scope, receive, send)
@@ -0,0 +1,119 @@
+"""Batch generation: many candidates in, one streamed ZIP out.
+
+Input is JSONL (one /generate payload per line) or CSV with a header row
+naming the same fields; CSV cells for ``experience_entries`` and
+``education_entries`` hold JSON.
+
+LLM calls fan out over a thread pool capped at ``concurrency``; each
+finished generation is handed straight to the PDF render pool for its two PDFs,
+and every PDF is written into the ZIP as soon as it is ready. The archive
+ends with ``manifest.json`` giving the status of every item.
+"""
+import io, csv, json, re, zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+JSON_FIELDS = ("experience_entries", "education_entries")
+
+
+class BatchError(ValueError):
+    pass
+
+
+def parse_items(body, fmt):
+    text = body.decode("utf-8-sig")
+    if fmt == "csv":
+        items = []
+        for row in csv.DictReader(io.StringIO(text)):
+            item = {k: v for k, v in row.items() if k and v not in (None, "")}
+            for k in JSON_FIELDS:
+                if k in item:
+                    try:
+                        item[k] = json.loads(item[k])
+                    except ValueError:
+                        raise BatchError(f"Row {len(items)+1}: {k} is not valid JSON")
+            items.append(item)
+        return items
+    items = []
+    for n, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            raise BatchError(f"Line {n}: not valid JSON")
+        if not isinstance(item, dict):
+            raise BatchError(f"Line {n}: expected a JSON object")
+        items.append(item)
+    return items
+
+
+class _Sink:
+    """Write-only, unseekable file for ZipFile; drained after each entry."""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        out, self.chunks = b"".join(self.chunks), []
+        return out
+
+
+def _folder(idx, item):
+    safe = re.sub(r"[^A-Za-z0-9_-]+", "_", item.get("name", "Candidate")).strip("_")
+    return f"{idx+1:03d}_{safe or 'Candidate'}"
+
+
+def stream_zip(items, generate, pdf_pool, concurrency):
+    """Yield ZIP bytes for ``items``.
+
+    ``generate(item)`` returns the saved history record; ``pdf_pool`` is the
+    app's ``PDFRenderPool``.
+    """
+    sink = _Sink()
+    zf   = zipfile.ZipFile(sink, "w")
+    status = [{"index": i, "name": it.get("name", "Candidate"), "status": "pending"}
+              for i, it in enumerate(items)]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as llm:
+        pending = {llm.submit(generate, it): ("llm", i, None) for i, it in enumerate(items)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                kind, i, fname = pending.pop(fut)
+                st = status[i]
+                if fut.exception() is not None:
+                    st["status"] = "error"
+                    st.setdefault("errors", []).append(f"{kind}: {fut.exception()}")
+                    continue
+                if kind == "llm":
+                    rec = fut.result()
+                    st.update(status="generated", record_id=rec["id"], files=[])
+                    folder = _folder(i, items[i])
+                    # block=True: a batch waits for render slots rather than
+                    # failing when the pool is busy.
+                    pending[pdf_pool.submit("pdf_builder:render_resume_data",
+                                            rec["structured"], rec.get("template"),
+                                            block=True)] = ("pdf", i, f"{folder}/Resume.pdf")
+                    pending[pdf_pool.submit("pdf_builder:render_cover", rec["output"],
+                                            rec["name"], rec["job_title"], block=True)] = \
+                        ("pdf", i, f"{folder}/Cover_Letter.pdf")
+                else:
+                    zf.writestr(fname, fut.result())
+                    st["files"].append(fname)
+                    if len(st["files"]) == 2 and st["status"] != "error":
+                        st["status"] = "ok"
+                    yield sink.drain()
+
+    manifest = {"total": len(items),
+                "ok": sum(s["status"] == "ok" for s in status),
+                "items": status}
+    zf.writestr("manifest.json", json.dumps(manifest, indent=2),
+                compress_type=zipfile.ZIP_DEFLATED)
+    zf.close()
+    yield sink.drain()
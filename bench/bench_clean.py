@@ -0,0 +1,87 @@
+"""Micro-benchmark for pdf_builder.clean().
+
+    python bench/bench_clean.py [--pdfs 200]
+
+Compares the current single-pass sanitizer with the original twelve
+str.replace passes + latin-1 round trip. It checks that both give
+identical output, then times them per call and per resume PDF, using the
+exact strings build_resume_pdf/build_cover_pdf pass through clean() for
+the canned stub output.
+"""
+import os, sys, time, random, argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pdf_builder
+from resume_parser import parse_output, parse_structured
+from stub_groq import CANNED_OUTPUT
+
+
+def clean_reference(text):
+    chars = {
+        "\u2018":"'","\u2019":"'","\u201c":'"',"\u201d":'"',
+        "\u2013":"-","\u2014":"-","\u2022":"-","\u2026":"...",
+        "\u00a0":" ","\u00b7":"-","\u2015":"-","\u2012":"-",
+    }
+    for k,v in chars.items():
+        text = text.replace(k,v)
+    return text.encode("latin-1", errors="replace").decode("latin-1")
+
+
+def captured_inputs():
+    """Every string one resume + one cover letter render passes to clean()."""
+    seen, real = [], pdf_builder.clean
+    def spy(text):
+        seen.append(text)
+        return real(text)
+    pdf_builder.clean = spy
+    try:
+        resume, cover = parse_output(CANNED_OUTPUT.replace(" - ", " \u2013 ")
+                                     .replace("'", "\u2019"))
+        raw = {"name": "Test Candidate", "email": "test@example.com",
+               "phone": "+91 98765 43210", "location": "Chennai, India"}
+        pdf_builder.build_resume_pdf(parse_structured(resume, raw))
+        pdf_builder.build_cover_pdf("Test Candidate", "Software Engineer", cover)
+    finally:
+        pdf_builder.clean = real
+    return seen
+
+
+def check_equivalence(n=20000):
+    rnd = random.Random(7)
+    pool = "abc XYZ 019-,.'\"" + "".join(chr(c) for c in (
+        0xa0, 0xb7, 0xe9, 0xff, 0x100, 0x2012, 0x2013, 0x2014, 0x2015, 0x2018,
+        0x2019, 0x201c, 0x201d, 0x2022, 0x2026, 0x0b95, 0x0627, 0x1f600, 0xd800))
+    for _ in range(n):
+        s = "".join(rnd.choice(pool) for _ in range(rnd.randint(0, 40)))
+        assert pdf_builder.clean(s) == clean_reference(s), repr(s)
+
+
+def timeit(fn, inputs, rounds):
+    t = time.perf_counter()
+    for _ in range(rounds):
+        for s in inputs:
+            fn(s)
+    return time.perf_counter() - t
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pdfs", type=int, default=200, help="simulated PDFs per timing")
+    args = ap.parse_args()
+
+    check_equivalence()
+    inputs = captured_inputs()
+    calls  = len(inputs) * args.pdfs
+    old = timeit(clean_reference, inputs, args.pdfs)
+    new = timeit(pdf_builder.clean, inputs, args.pdfs)
+    print(f"clean() calls per resume+cover: {len(inputs)}")
+    print(f"reference : {old / calls * 1e9:8.0f} ns/call  {old / args.pdfs * 1e6:8.1f} us/PDF")
+    print(f"current   : {new / calls * 1e9:8.0f} ns/call  {new / args.pdfs * 1e6:8.1f} us/PDF")
+    print(f"speed-up  : {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
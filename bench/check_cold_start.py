@@ -0,0 +1,54 @@
+"""Enforce the cold-start import budget:
+
+    python bench/check_cold_start.py [--budget-ms 400] [--runs 5]
+
+Checks, each in fresh interpreters, that ``import app`` stays under the
+budget (median of ``--runs``; COLD_START_BUDGET_MS overrides the default),
+that it loads none of groq/httpx/fpdf/asyncio, that history routes load
+none of them either, that PDF routes never touch the Groq client and that
+DOCX/text exports load neither groq nor fpdf2. Exits non-zero on any failure.
+"""
+import os, sys, argparse, statistics
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from profile_imports import import_ms, import_profile, probe_route
+
+LLM = {"groq", "httpx", "httpcore"}
+PDF = {"fpdf", "fontTools", "PIL"}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget-ms", type=float,
+                    default=float(os.getenv("COLD_START_BUDGET_MS", 400)))
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    results = {}
+    times = [import_ms() for _ in range(args.runs)]
+    ms = statistics.median(times)
+    results[f"import app {ms:.0f} ms <= {args.budget_ms:.0f} ms"] = ms <= args.budget_ms
+
+    loaded = {name.split(".")[0] for name, *_ in import_profile()}
+    results["import app skips groq/httpx"]  = not loaded & LLM
+    results["import app skips fpdf"]        = not loaded & PDF
+    results["import app skips asyncio"]     = "asyncio" not in loaded
+
+    for route, banned in (("GET /api/history", LLM | PDF),
+                          ("GET /records/<id>/resume.pdf", LLM),
+                          ("GET /records/<id>/resume.docx", LLM | PDF),
+                          ("GET /records/<id>/cover.txt", LLM | PDF)):
+        r = probe_route(route)
+        extra = sorted(set(r["new_packages"]) & banned)
+        results[f"{route} {r['status']}" + (f" loads {', '.join(extra)}" if extra else "")] = \
+            r["status"] == 200 and not extra
+
+    width = max(map(len, results))
+    for name, ok in results.items():
+        print(f"{name:<{width}}  {'ok' if ok else 'FAIL'}")
+    sys.exit(0 if all(results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
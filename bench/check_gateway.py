@@ -0,0 +1,123 @@
+"""Drive ``llm_gateway`` against ``fake_groq`` over real HTTP and check each
+resilience behaviour:
+
+    python bench/check_gateway.py
+
+Covers retry-then-succeed on 503 and 429, fail-fast on 400, the per-call
+deadline, the circuit opening and recovering through a half-open probe,
+fallback to a second model, and streaming; then retry, fallback and the
+deadline again for async calls through ``AsyncLLMRunner``. Exits non-zero
+on any failure.
+"""
+import os, sys, time, asyncio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from groq import BadRequestError, APITimeoutError, InternalServerError
+from llm_gateway import LLMGateway, CircuitOpen, make_client, make_async_client
+from llm_async import AsyncLLMRunner
+from fake_groq import Script, serve
+
+MODEL, SMALL = "llama-3.3-70b-versatile", "llama-3.1-8b-instant"
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def gateway(url, **kw):
+    os.environ["GROQ_BASE_URL"] = url
+    kw.setdefault("backoff", 0.01)
+    return LLMGateway(make_client("fake", timeout=5),
+                      async_client_factory=lambda: make_async_client("fake", timeout=5), **kw)
+
+
+def call(gw, **kw):
+    return gw.chat.completions.create(model=MODEL, messages=MESSAGES, max_tokens=10, **kw)
+
+
+LOOP = asyncio.new_event_loop()   # the async clients outlive one asyncio.run
+
+
+def acall(gw, **kw):
+    runner = AsyncLLMRunner(gw.acreate)
+    return LOOP.run_until_complete(asyncio.wait_for(
+        runner.run(model=MODEL, messages=MESSAGES, max_tokens=10, **kw), 5))
+
+
+def expect(exc, fn):
+    try:
+        fn()
+    except exc:
+        return True
+    return False
+
+
+def main():
+    results = {}
+    script = Script()
+    server, url = serve(0, script)
+
+    script.__init__(503, 2)
+    gw = gateway(url)
+    results["retry 503"] = call(gw).choices[0].message.content.startswith("--- RESUME")
+    results["retry 503 count"] = gw.counts["retries"] == 2
+
+    script.__init__(429, 1)
+    results["retry 429"] = bool(call(gateway(url)).choices)
+
+    script.__init__(400, 1)
+    gw = gateway(url)
+    results["no retry on 400"] = expect(BadRequestError, lambda: call(gw)) and \
+                                 len(script.calls) == 1
+
+    script.__init__(latency=0.5)
+    t0 = time.monotonic()
+    results["deadline"] = expect(APITimeoutError, lambda: call(gateway(url), timeout=0.2)) \
+                          and time.monotonic() - t0 < 0.45
+
+    script.__init__(500, 100)
+    gw = gateway(url, max_attempts=2, failure_threshold=4, cooldown=0.3)
+    for _ in range(2):
+        expect(InternalServerError, lambda: call(gw))
+    n = len(script.calls)
+    results["breaker opens"] = gw.breaker(MODEL).state == "open" and \
+                               expect(CircuitOpen, lambda: call(gw)) and len(script.calls) == n
+    script.__init__()
+    time.sleep(0.35)
+    results["breaker half-open probe"] = bool(call(gw).choices) and \
+                                         gw.breaker(MODEL).state == "closed"
+
+    script.__init__(503, 100, fail_model=MODEL)
+    gw = gateway(url, fallback_model=SMALL, max_attempts=2)
+    call(gw)
+    results["fallback"] = script.calls[-1] == SMALL and gw.counts["fallbacks"] == 1
+
+    script.__init__(503, 1)
+    chunks = call(gateway(url), stream=True)
+    text = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+    results["stream after retry"] = text.startswith("--- RESUME")
+
+    script.__init__(503, 2)
+    gw = gateway(url)
+    results["async retry 503"] = acall(gw).choices[0].message.content.startswith("--- RESUME") \
+                                 and gw.counts["retries"] == 2
+
+    script.__init__(503, 100, fail_model=MODEL)
+    gw = gateway(url, fallback_model=SMALL, max_attempts=2)
+    acall(gw)
+    results["async fallback"] = script.calls[-1] == SMALL and gw.counts["fallbacks"] == 1
+
+    script.__init__(latency=0.5)
+    t0 = time.monotonic()
+    results["async deadline"] = expect(APITimeoutError, lambda: acall(gateway(url), timeout=0.2)) \
+                                and time.monotonic() - t0 < 0.45
+
+    server.shutdown()
+    width = max(map(len, results))
+    for name, ok in results.items():
+        print(f"{name:<{width}}  {'ok' if ok else 'FAIL'}")
+    sys.exit(0 if all(results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
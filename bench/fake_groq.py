@@ -0,0 +1,122 @@
+"""Local HTTP stand-in for the Groq chat completions API.
+
+Serves ``POST /openai/v1/chat/completions`` (streaming and not) with the
+canned resume from ``stub_groq``, and can be told to misbehave so the
+gateway's retries, deadlines, circuit breaker and fallback can be exercised
+against a real socket:
+
+    python bench/fake_groq.py [--port 8765] [--fail 503:3] [--latency 0.2]
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=x flask run
+
+``--fail STATUS:N`` answers the next N calls with STATUS (429 adds
+Retry-After: 0); ``--fail-model`` limits failures to one model name.
+"""
+import os, sys, json, time, argparse, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stub_groq import CANNED_OUTPUT
+
+
+class Script:
+    """What the server does next; mutable from the test driving it."""
+    def __init__(self, fail_status=None, fail_count=0, fail_model=None, latency=0.0):
+        self.fail_status, self.fail_count = fail_status, fail_count
+        self.fail_model, self.latency = fail_model, latency
+        self.calls = []
+        self.mutex = threading.Lock()
+
+    def next_failure(self, model):
+        with self.mutex:
+            self.calls.append(model)
+            if self.fail_count and (self.fail_model in (None, model)):
+                self.fail_count -= 1
+                return self.fail_status
+        return None
+
+
+def _completion(model, content, chunk=False):
+    choice = {"index": 0, "finish_reason": "stop"}
+    choice["delta" if chunk else "message"] = {"role": "assistant", "content": content}
+    body = {"id": "chatcmpl-fake", "object": "chat.completion.chunk" if chunk
+            else "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [choice]}
+    if not chunk:
+        body["usage"] = {"prompt_tokens": 900, "completion_tokens": 700,
+                         "total_tokens": 1600}
+    return body
+
+
+def make_handler(script):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, status, body, headers=()):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in headers:
+                self.send_header(k, v)
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except BrokenPipeError:     # client hit its deadline first
+                pass
+
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            model = req.get("model", "")
+            if not self.path.endswith("/chat/completions"):
+                return self._json(404, {"error": {"message": "not found"}})
+            status = script.next_failure(model)
+            if script.latency:
+                time.sleep(script.latency)
+            if status:
+                headers = [("Retry-After", "0")] if status == 429 else []
+                return self._json(status, {"error": {"message": f"fake {status}",
+                                                     "type": "fake"}}, headers)
+            if not req.get("stream"):
+                return self._json(200, _completion(model, CANNED_OUTPUT))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i in range(0, len(CANNED_OUTPUT), 40):
+                frame = json.dumps(_completion(model, CANNED_OUTPUT[i:i+40], chunk=True))
+                self.wfile.write(f"data: {frame}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    return Handler
+
+
+def serve(port=0, script=None):
+    """Start a server thread; returns ``(server, base_url)``."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(script or Script()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--fail", default="", help="STATUS:N, e.g. 503:3")
+    ap.add_argument("--fail-model")
+    ap.add_argument("--latency", type=float, default=0.0)
+    args = ap.parse_args()
+    status, count = (map(int, args.fail.split(":")) if args.fail else (None, 0))
+    server, url = serve(args.port, Script(status, count, args.fail_model, args.latency))
+    print(f"fake Groq on {url}  (GROQ_BASE_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Import-time profile of a cold start.
+
+    python bench/profile_imports.py [--top 15] [--json]
+
+Imports ``app`` in a fresh interpreter under ``-X importtime`` and prints the
+heaviest imports below it, by cumulative and by self time. Then, per route,
+a fresh interpreter imports ``app``, sends one request and reports its time
+and the third-party packages that request pulled in on top of the import.
+That is what a serverless cold start pays before its first response.
+POST /generate talks to ``fake_groq`` through the real client, so the
+groq/httpx cost is counted.
+
+Every run uses temp history/jobs files and inline PDF rendering
+(PDF_POOL_WORKERS=0). Modules loaded before ``app`` (site, .pth hooks) are
+not counted.
+"""
+import os, sys, json, time, argparse, tempfile, subprocess
+
+ROOT  = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.dirname(os.path.abspath(__file__))
+
+ROUTES = ("GET /", "GET /api/history", "GET /records/<id>/resume.pdf",
+          "GET /records/<id>/resume.docx", "POST /generate")
+HEAVY  = ("groq", "httpx", "httpcore", "fpdf", "fontTools", "PIL", "dotenv", "asyncio")
+
+
+def cold_env(tmp):
+    return dict(os.environ, HISTORY_DB=os.path.join(tmp, "h.sqlite3"),
+                HISTORY_JSON=os.path.join(tmp, "h.json"),
+                JOBS_DB=os.path.join(tmp, "jobs.sqlite3"),
+                GROQ_API_KEY=os.getenv("GROQ_API_KEY", "stub"),
+                PDF_POOL_WORKERS="0", RATE_LIMIT="0", PYTHONDONTWRITEBYTECODE="1")
+
+
+def run(args, tmp):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, env=cold_env(tmp),
+                          capture_output=True, text=True, check=True)
+
+
+def import_profile():
+    """``[(name, depth, self_us, cumulative_us), ...]`` for ``import app``
+    and everything below it, in -X importtime order (children first)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        err = run(["-X", "importtime", "-c", "import app"], tmp).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cum_us)))
+    # app is the last top-level entry; its subtree is the run just before it.
+    end = max(i for i, r in enumerate(rows) if r[0] == "app")
+    start = end
+    while start > 0 and rows[start-1][1] > 0:
+        start -= 1
+    return rows[start:end+1]
+
+
+def import_ms(repeat=1):
+    """Wall time of ``import app`` in fresh interpreters; the best of ``repeat``."""
+    best = None
+    code = ("import time; t = time.perf_counter(); import app; "
+            "print((time.perf_counter() - t) * 1000)")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            ms = float(run(["-c", code], tmp).stdout.split()[-1])
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def probe_route(route):
+    """Fresh interpreter: import app, one request on ``route``. Returns
+    ``{"status", "ms", "new_packages"}``."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = run([os.path.abspath(__file__), "--probe", route], tmp).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def _probe(route):
+    sys.path[:0] = [ROOT, BENCH]
+    if route == "POST /generate":
+        from fake_groq import serve
+        _, url = serve()
+        os.environ["GROQ_BASE_URL"] = url
+    import app
+    from stub_groq import CANNED_OUTPUT
+    rec = app.make_record({"name": "Cold Start", "job_title": "Engineer"}, CANNED_OUTPUT)
+    app.store.insert(rec)
+    before = {m.split(".")[0] for m in sys.modules}
+    c = app.app.test_client()
+    method, path = route.split(" ", 1)
+    path = path.replace("<id>", rec["id"])
+    t0 = time.perf_counter()
+    if method == "POST":
+        r = c.post(path, json={"name": "Cold Start", "job_title": "Engineer"})
+    else:
+        r = c.get(path)
+    ms = (time.perf_counter() - t0) * 1000
+    new = sorted({m.split(".")[0] for m in sys.modules} - before)
+    print(json.dumps({"status": r.status_code, "ms": round(ms, 1),
+                      "new_packages": [m for m in new if not m.startswith("_")]}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--probe", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.probe:
+        return _probe(args.probe)
+
+    rows = import_profile()
+    total = rows[-1][3]
+    report = {
+        "import_app_ms": round(total / 1000, 1),
+        "heavy_at_import": sorted({n.split(".")[0] for n, *_ in rows} & set(HEAVY)),
+        "by_cumulative": [(n, round(c / 1000, 1)) for n, d, s, c in
+                          sorted(rows[:-1], key=lambda r: -r[3]) if d == 1][:args.top],
+        "by_self": [(n, round(s / 1000, 1)) for n, d, s, c in
+                    sorted(rows, key=lambda r: -r[2])][:args.top],
+        "routes": {route: probe_route(route) for route in ROUTES},
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"import app: {report['import_app_ms']} ms   heavy packages at import: "
+          f"{', '.join(report['heavy_at_import']) or 'none'}\n")
+    print("direct imports of app, cumulative ms")
+    for name, ms in report["by_cumulative"]:
+        print(f"  {ms:8.1f}  {name}")
+    print("\nany module, self ms")
+    for name, ms in report["by_self"]:
+        print(f"  {ms:8.1f}  {name}")
+    print("\nfirst request after import")
+    for route, r in report["routes"].items():
+        print(f"  {route:<32} {r['status']}  {r['ms']:8.1f} ms   "
+              f"+ {', '.join(m for m in r['new_packages'] if m in HEAVY) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
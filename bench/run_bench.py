@@ -0,0 +1,298 @@
+"""Reproducible benchmark suite: parser, PDF builders, history store, routes.
+
+    python bench/run_bench.py [--quick] [--only parse,pdf,edit,history,routes]
+                              [--out bench/results/NAME.json]
+                              [--compare bench/results/OLD.json]
+
+Everything runs offline. The Groq client is ``stub_groq.StubGroq`` (canned
+output in SYSTEM_PROMPT format, optional --delay), and every store/cache
+file lives in a temp directory.
+
+  parse    parse_structured ops/s for small / medium / large resumes
+  pdf      build_resume_pdf / build_cover_pdf ops/s for the same sizes, and
+           the medium resume per template (also with 50 extra templates
+           registered, which should not change the numbers)
+  edit     estimated tokens of a full generation vs. each section edit
+  history  JSON load+save and SQLite insert/get/page at 1k/10k/100k records
+  routes   end-to-end requests/s per Flask route at --concurrency threads
+
+Results are written as JSON (default bench/results/<timestamp>.json) with
+the git commit and platform, and ``--compare`` prints the change against an
+earlier run.
+"""
+import os, sys, json, time, uuid, random, shutil, argparse, platform, tempfile, \
+       threading, itertools, subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT  = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH)
+
+from stub_groq import StubGroq, CANNED_OUTPUT
+
+SIZES = {"small": (1, 2, 1), "medium": (3, 3, 2), "large": (8, 5, 4)}   # jobs, bullets, projects
+
+
+def canned_output(jobs, bullets, projects):
+    """CANNED_OUTPUT scaled to ``jobs`` experience entries etc."""
+    exp = []
+    for j in range(jobs):
+        exp.append(f"Software Engineer {j+1} | Company {j+1} | Jan 20{10+j} - Dec 20{11+j} | Chennai")
+        exp += [f"- Delivered project {b+1} at Company {j+1}, cutting costs by {5*(b+1)}%"
+                for b in range(bullets)]
+    proj = []
+    for p in range(projects):
+        proj += [f"Project {p+1} | Python, Flask", f"- Served {100*(p+1)} users a day"]
+    head, rest = CANNED_OUTPUT.split("EXPERIENCE\n", 1)
+    _, rest = rest.split("\nEDUCATION", 1)
+    rest = "\nEDUCATION" + rest
+    before, after = rest.split("PROJECTS\n", 1)
+    _, after = after.split("\nCERTIFICATIONS", 1)
+    return (head + "EXPERIENCE\n" + "\n".join(exp) + "\n" + before + "PROJECTS\n" +
+            "\n".join(proj) + "\n\nCERTIFICATIONS" + after)
+
+
+def timed(fn, seconds):
+    """Run ``fn`` repeatedly for about ``seconds``; return calls per second."""
+    fn()                                    # warm-up
+    n, t0 = 0, time.perf_counter()
+    while True:
+        fn(); n += 1
+        dt = time.perf_counter() - t0
+        if dt >= seconds:
+            return round(n / dt, 2)
+
+
+# ─────────────────────────────────────────────────────────────
+#  SECTIONS
+# ─────────────────────────────────────────────────────────────
+def bench_parse(args):
+    from resume_parser import parse_output, parse_structured
+    out = {}
+    for size, shape in SIZES.items():
+        text = parse_output(canned_output(*shape))[0]
+        out[size] = {"chars": len(text),
+                     "ops_per_s": timed(lambda: parse_structured(text, {}), args.seconds)}
+    return out
+
+
+def bench_pdf(args):
+    from resume_parser import parse_output, parse_structured
+    from pdf_builder import build_resume_pdf, build_cover_pdf
+    import pdf_templates
+    out = {}
+    for size, shape in SIZES.items():
+        resume, cover = parse_output(canned_output(*shape))
+        data = parse_structured(resume, {"name": "Bench Candidate"})
+        out[size] = {
+            "resume_ops_per_s": timed(lambda: build_resume_pdf(data), args.seconds),
+            "cover_ops_per_s":  timed(lambda: build_cover_pdf("Bench Candidate", "Engineer",
+                                                              cover), args.seconds),
+        }
+
+    resume, _ = parse_output(canned_output(*SIZES["medium"]))
+    data = parse_structured(resume, {"name": "Bench Candidate"})
+    builtin = pdf_templates.names()
+    per_template = lambda: {t: timed(lambda: build_resume_pdf(data, t), args.seconds)
+                            for t in builtin}
+    out["templates"] = {"resume_ops_per_s": per_template()}
+    for i in range(50):
+        pdf_templates.register(f"bench-{i}", {"base": "modern", "margin": 10 + i % 5})
+    out["templates"]["resume_ops_per_s_with_50_more"] = per_template()
+    return out
+
+
+def bench_edit(args):
+    """Token cost (estimated input + completion) of regenerating everything
+    vs. one section with section_edit, for the medium resume."""
+    import prompt_budget, section_edit
+    from app import SYSTEM_PROMPT, build_prompt
+    from resume_parser import parse_output, parse_structured
+    output = canned_output(*SIZES["medium"])
+    resume, cover = parse_output(output)
+    data = {"name": "Bench Candidate", "job_title": "Engineer"}
+    record = dict(data, output=output)
+    structured = parse_structured(resume, {})
+    est = prompt_budget.estimate_tokens
+    prompt, max_tokens, _ = prompt_budget.plan(data, build_prompt(data), SYSTEM_PROMPT)
+    full_in = est(SYSTEM_PROMPT + prompt)
+    full_out = est(resume) + est(cover)
+    out = {"full": {"input": full_in, "completion": full_out, "max_tokens": max_tokens}}
+    replies = {"summary": structured["summary"], "projects": resume.split("PROJECTS", 1)[1],
+               "cover": cover, "experience": "\n".join(resume.split("EXPERIENCE\n", 1)[1]
+                                                       .split("\n")[:4])}
+    for target in section_edit.TARGETS:
+        system, prompt, max_tokens = section_edit.build(target, record, structured, 0)
+        row = {"input": est(system + prompt), "completion": est(replies[target]),
+               "max_tokens": max_tokens}
+        row["saving_x"] = round((full_in + full_out) / (row["input"] + row["completion"]), 1)
+        out[target] = row
+    return out
+
+
+def _records(n):
+    day = "2024-01-01 10:00"
+    return [{"id": uuid.uuid4().hex[:8], "name": f"Candidate {i}", "job_title": "Engineer",
+             "template": "modern", "output": CANNED_OUTPUT, "raw": {}, "created_at": day}
+            for i in range(n)]
+
+
+def bench_history(args, tmp):
+    from history_store import JsonHistoryStore, SQLiteHistoryStore
+    out = {}
+    for n in args.history_sizes:
+        records = _records(n)
+        ids = random.Random(0).sample([r["id"] for r in records], min(200, n))
+        row = {}
+
+        js = JsonHistoryStore(os.path.join(tmp, f"h{n}.json"))
+        t0 = time.perf_counter(); js.save(records); row["json_save_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter(); js.load();        row["json_load_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter(); js.insert(_records(1)[0])
+        row["json_insert_one_s"] = time.perf_counter() - t0
+
+        sq = SQLiteHistoryStore(os.path.join(tmp, f"h{n}.sqlite3"))
+        t0 = time.perf_counter(); sq.insert_missing(records)
+        row["sqlite_bulk_insert_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter(); sq.insert(_records(1)[0])
+        row["sqlite_insert_one_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for rid in ids: sq.get(rid)
+        row["sqlite_get_s"] = (time.perf_counter() - t0) / len(ids)
+        t0 = time.perf_counter(); page, cursor = sq.list_summaries(50)
+        row["sqlite_first_page_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter(); sq.list_summaries(50, filters={"name": "Candidate 99"})
+        row["sqlite_filtered_page_s"] = time.perf_counter() - t0
+        out[str(n)] = {k: round(v, 6) for k, v in row.items()}
+    return out
+
+
+def bench_routes(args):
+    import app
+    from cache import open_pdf_cache
+    app.client.client = StubGroq(delay=args.delay)
+    local = threading.local()
+
+    def http():
+        if not hasattr(local, "c"):
+            local.c = app.app.test_client()
+        return local.c
+
+    seed = [http().post("/generate", json={"name": f"Seed {i}", "job_title": "Engineer"}).json["id"]
+            for i in range(args.requests)]
+    rec = app.store.get(seed[0])
+    counter = itertools.count()
+
+    routes = {
+        "POST /generate": lambda: http().post("/generate", json={
+            "name": f"Load {next(counter)}", "job_title": "Engineer"}),
+        "POST /generate (cached)": lambda: http().post("/generate", json={
+            "name": "Seed 0", "job_title": "Engineer"}),
+        "POST /generate/stream": lambda: http().post("/generate/stream", json={
+            "name": f"Stream {next(counter)}", "job_title": "Engineer"}).get_data(),
+        "GET /api/history": lambda: http().get("/api/history?limit=50"),
+        "GET /api/history/<id>": lambda: http().get(f"/api/history/{random.choice(seed)}"),
+        "GET /records/<id>/resume.pdf (cold)": lambda: http().get(
+            f"/records/{seed[next(counter) % len(seed)]}/resume.pdf"),
+        "GET /records/<id>/resume.pdf (cached)": lambda: http().get(
+            f"/records/{seed[0]}/resume.pdf"),
+        "GET /records/<id>/export.zip": lambda: http().get(
+            f"/records/{seed[next(counter) % len(seed)]}/export.zip"),
+        "POST /download-cover-pdf": lambda: http().post("/download-cover-pdf", json={
+            "output": rec["output"], "name": rec["name"], "job_title": rec["job_title"]}),
+    }
+    out = {}
+    for name, fn in routes.items():
+        if "(cold)" in name:
+            app.pdf_cache = open_pdf_cache()           # start from an empty cache
+        statuses = []
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            for r in pool.map(lambda _: fn(), range(args.requests)):
+                statuses.append(getattr(r, "status_code", 200))
+        dt = time.perf_counter() - t0
+        out[name] = {"requests": args.requests, "concurrency": args.concurrency,
+                     "req_per_s": round(args.requests / dt, 2),
+                     "errors": sum(s >= 400 for s in statuses)}
+    app.pdf_pool.shutdown()
+    return out
+
+
+# ─────────────────────────────────────────────────────────────
+#  RESULTS
+# ─────────────────────────────────────────────────────────────
+def _flatten(d, prefix=""):
+    for k, v in d.items():
+        if isinstance(v, dict):
+            yield from _flatten(v, f"{prefix}{k}.")
+        elif isinstance(v, (int, float)):
+            yield f"{prefix}{k}", v
+
+
+def compare(old, new):
+    before = dict(_flatten(old["results"]))
+    for key, value in _flatten(new["results"]):
+        if key in before and before[key]:
+            change = (value - before[key]) / before[key] * 100
+            print(f"{key:<70} {before[key]:>12g} -> {value:>12g}  {change:+6.1f}%")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--only", default="parse,pdf,edit,history,routes")
+    ap.add_argument("--quick", action="store_true", help="short timings, small sizes")
+    ap.add_argument("--seconds", type=float, default=2.0, help="time per micro-benchmark")
+    ap.add_argument("--history-sizes", default="1000,10000,100000")
+    ap.add_argument("--requests", type=int, default=200, help="requests per route")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--delay", type=float, default=0.05, help="stub model latency (s)")
+    ap.add_argument("--out")
+    ap.add_argument("--compare")
+    args = ap.parse_args()
+    if args.quick:
+        args.seconds, args.requests, args.history_sizes = 0.3, 40, "1000,10000"
+    args.history_sizes = [int(n) for n in args.history_sizes.split(",")]
+    only = set(args.only.split(","))
+
+    tmp = tempfile.mkdtemp(prefix="resume-bench-")
+    os.environ.update(HISTORY_DB=os.path.join(tmp, "app.sqlite3"),
+                      HISTORY_JSON=os.path.join(tmp, "app.json"),
+                      JOBS_DB=os.path.join(tmp, "jobs.sqlite3"),
+                      GROQ_API_KEY=os.getenv("GROQ_API_KEY", "stub"),
+                      # One client hammering the app is the point here.
+                      RATE_LIMIT=os.getenv("RATE_LIMIT", "0"))
+    results = {}
+    try:
+        for name, fn in (("parse", bench_parse), ("pdf", bench_pdf), ("edit", bench_edit),
+                         ("history", lambda a: bench_history(a, tmp)),
+                         ("routes", bench_routes)):
+            if name in only:
+                print(f"running {name} ...", file=sys.stderr)
+                results[name] = fn(args)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    report = {"commit": commit, "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "cpus": os.cpu_count(), "args": {k: v for k, v in vars(args).items()
+                                               if k not in ("out", "compare")},
+              "results": results}
+    out = args.out or os.path.join(BENCH, "results", time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"saved {out}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Fire many concurrent /generate calls from several processes and check
+that every generated record made it into history.
+
+    python bench/stress_generate.py [--procs 8] [--threads 32] [--calls 400]
+                                    [--backend sqlite|json]
+
+Each process imports app.py with a stubbed Groq client and drives it through
+Flask's test client, so all processes share one history file just like
+gunicorn workers do. Exits non-zero if any record is missing.
+"""
+import os, sys, argparse, tempfile, multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _worker(n_calls, n_threads, delay, out):
+    import app
+    from stub_groq import StubGroq
+    app.client.client = StubGroq(delay=delay)   # keep the gateway in the path
+    client = app.app.test_client()
+
+    def one(i):
+        r = client.post("/generate", json={"name": f"Stress {os.getpid()}-{i}",
+                                           "job_title": "Engineer"})
+        return r.get_json().get("id") if r.status_code == 200 else None
+
+    with ThreadPoolExecutor(n_threads) as pool:
+        out.put(list(pool.map(one, range(n_calls))))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs",   type=int, default=8)
+    ap.add_argument("--threads", type=int, default=32)
+    ap.add_argument("--calls",   type=int, default=400, help="total /generate calls")
+    ap.add_argument("--delay",   type=float, default=0.01, help="stub model latency (s)")
+    ap.add_argument("--backend", default="sqlite", choices=["sqlite", "json"])
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="resume-stress-")
+    os.environ.update(HISTORY_BACKEND=args.backend,
+                      HISTORY_DB=os.path.join(tmp, "resumes_db.sqlite3"),
+                      HISTORY_JSON=os.path.join(tmp, "resumes_db.json"),
+                      GROQ_API_KEY=os.getenv("GROQ_API_KEY", "stub"),
+                      # One client hammering the app is the point here.
+                      RATE_LIMIT=os.getenv("RATE_LIMIT", "0"))
+
+    per_proc = max(1, args.calls // args.procs)
+    out = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_worker,
+                                     args=(per_proc, args.threads, args.delay, out))
+             for _ in range(args.procs)]
+    for p in procs: p.start()
+    ids = [i for _ in procs for i in out.get()]
+    for p in procs: p.join()
+
+    from history_store import open_store
+    store, stored, cursor = open_store(), set(), None
+    while True:
+        page, cursor = store.list_summaries(500, cursor)
+        stored.update(r["id"] for r in page)
+        if cursor is None:
+            break
+    failed  = ids.count(None)
+    missing = [i for i in ids if i and i not in stored]
+    print(f"backend={args.backend} calls={len(ids)} failed={failed} "
+          f"stored={len(stored)} missing={len(missing)}")
+    sys.exit(1 if failed or missing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Offline stand-in for the Groq client used by the bench scripts.
+
+``StubGroq`` mimics the parts of ``groq.Groq`` that app.py touches and
+answers every chat completion with canned text in SYSTEM_PROMPT format,
+optionally after a fixed delay to imitate model latency.
+"""
+import time
+from types import SimpleNamespace
+
+CANNED_OUTPUT = """--- RESUME ---
+SUMMARY
+Detail-oriented Software Engineer with 3+ years of experience building web applications in Python and JavaScript. Skilled at designing REST APIs, automating workflows and shipping features end to end. Proven ability to cut page latency and improve reliability in production. Eager to bring pragmatic engineering to a product-focused team.
+
+EXPERIENCE
+Software Engineer | Acme Corp | Jan 2022 - Present | Chennai
+- Built a Flask service that generates 10k documents a day
+- Cut p95 latency by 40% by caching model responses
+- Mentored two interns on testing and code review
+Junior Developer | Beta Labs | Jun 2020 - Dec 2021 | Remote
+- Shipped a React dashboard used by 200 internal users
+- Automated weekly reporting, saving 6 hours a week
+
+EDUCATION
+B.E. Computer Science | Anna University | 2020 | 8.5 CGPA | Chennai
+
+SKILLS
+Python, Flask, JavaScript, React, SQL, Docker, AWS
+
+PROJECTS
+ResumeAI | Flask, Groq, fpdf2
+- Generates tailored resumes and cover letters from a short form
+Budget Tracker | React, Firebase
+- Tracks shared expenses for 500+ monthly users
+
+CERTIFICATIONS
+- AWS Certified Cloud Practitioner
+- Google Data Analytics
+
+LANGUAGES
+English: Fluent, Tamil: Native, Urdu: Fluent
+
+--- COVER LETTER ---
+Dear Hiring Manager,
+
+I am excited to apply for the Software Engineer role. Over the past three years I have built and operated Python web services, most recently a **document generation** pipeline at Acme Corp.
+
+I would welcome the chance to bring the same focus on reliability and speed to your team.
+
+Sincerely,
+Test Candidate"""
+
+
+def _response(content, prompt_tokens=900, completion_tokens=700):
+    msg = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(index=0, message=msg, delta=msg, finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens,
+                              completion_tokens=completion_tokens,
+                              total_tokens=prompt_tokens + completion_tokens))
+
+
+class _Completions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, model=None, messages=None, max_tokens=None, stream=False, **kw):
+        self.owner.calls += 1
+        if self.owner.delay:
+            time.sleep(self.owner.delay)
+        text = self.owner.output
+        if stream:
+            step = self.owner.chunk_size
+            return iter([_response(text[i:i+step]) for i in range(0, len(text), step)])
+        return _response(text)
+
+
+class StubGroq:
+    def __init__(self, output=CANNED_OUTPUT, delay=0.0, chunk_size=24):
+        self.output, self.delay, self.chunk_size = output, delay, chunk_size
+        self.calls = 0
+        self.chat  = SimpleNamespace(completions=_Completions(self))
@@ -0,0 +1,193 @@
+"""Small TTL + LRU caches with interchangeable backends.
+
+  MemoryCache  per-process OrderedDict, bounded by entry count and bytes
+  DiskCache    SQLite file shared by every worker on the box
+  TieredCache  memory in front of disk, promoting disk hits
+
+All store ``bytes`` values under ``str`` keys and expire entries after
+``ttl`` seconds (None = never). ``LLMCache`` sits on top of any of them and
+keys model responses by a hash of everything that shapes the completion;
+``open_pdf_cache`` builds the cache for rendered PDFs.
+"""
+import os, time, json, hashlib, threading
+from collections import OrderedDict
+
+from sqlite_conn import LocalConnection, writable_path
+
+
+class MemoryCache:
+    def __init__(self, max_entries=512, max_bytes=None, ttl=None):
+        self.max_entries, self.max_bytes, self.ttl = max_entries, max_bytes, ttl
+        self.data  = OrderedDict()   # key -> (expires_at, value)
+        self.size  = 0
+        self.mutex = threading.Lock()
+
+    def get(self, key):
+        with self.mutex:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            if item[0] is not None and item[0] < time.time():
+                self._drop(key)
+                return None
+            self.data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl if self.ttl else None
+        with self.mutex:
+            if key in self.data:
+                self._drop(key)
+            self.data[key] = (expires, value)
+            self.size += len(value)
+            while self.data and (len(self.data) > self.max_entries or
+                                 (self.max_bytes and self.size > self.max_bytes)):
+                self._drop(next(iter(self.data)))
+
+    def delete(self, key):
+        with self.mutex:
+            if key in self.data:
+                self._drop(key)
+
+    def _drop(self, key):
+        self.size -= len(self.data.pop(key)[1])
+
+    def __len__(self):
+        return len(self.data)
+
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY, value BLOB NOT NULL,
+    expires_at REAL, used_at REAL NOT NULL) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at);
+"""
+
+
+class DiskCache:
+    def __init__(self, path, max_entries=5000, ttl=None):
+        self.path, self.max_entries, self.ttl = path, max_entries, ttl
+        self._conn = LocalConnection(path, schema=DISK_SCHEMA)   # opened on first use
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at FROM cache WHERE key=?",
+                           (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if row[1] is not None and row[1] < now:
+            conn.execute("DELETE FROM cache WHERE key=?", (key,))
+            return None
+        conn.execute("UPDATE cache SET used_at=? WHERE key=?", (now, key))
+        return bytes(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        expires = now + self.ttl if self.ttl else None
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO cache (key,value,expires_at,used_at) "
+                     "VALUES (?,?,?,?)", (key, value, expires, now))
+        # Over the cap, evict the least recently used rows (both via the
+        # used_at index, not a sort of the table).
+        over = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if over > 0:
+            conn.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                         "ORDER BY used_at LIMIT ?)", (over,))
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache WHERE key=?", (key,))
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    def __init__(self, memory, disk):
+        self.memory, self.disk = memory, disk
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        self.disk.delete(key)
+
+    def __len__(self):
+        return len(self.disk)
+
+
+def content_key(*parts):
+    """Stable sha256 of JSON-able parts (dict key order does not matter)."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# ─────────────────────────────────────────────────────────────
+#  LLM RESPONSE CACHE
+# ─────────────────────────────────────────────────────────────
+class LLMCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(model, system_prompt, prompt, max_tokens):
+        blob = json.dumps([model, system_prompt, prompt, max_tokens])
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode("utf-8")
+
+    def set(self, key, text):
+        if self.backend is not None:
+            self.backend.set(key, text.encode("utf-8"))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"backend": type(self.backend).__name__ if self.backend is not None else None,
+                "entries": len(self.backend) if self.backend is not None else 0,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+
+def open_llm_cache():
+    """Build the LLM cache from LLM_CACHE (memory|disk|off) and friends."""
+    kind = os.getenv("LLM_CACHE", "memory").lower()
+    ttl  = float(os.getenv("LLM_CACHE_TTL", 24 * 3600)) or None
+    size = int(os.getenv("LLM_CACHE_SIZE", 512))
+    if kind == "off":
+        return LLMCache(None)
+    if kind == "disk":
+        path = writable_path(os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3"))
+        return LLMCache(DiskCache(path, max_entries=size, ttl=ttl))
+    if kind != "memory":
+        raise ValueError(f"Unknown LLM_CACHE: {kind}")
+    return LLMCache(MemoryCache(max_entries=size, ttl=ttl))
+
+
+def open_pdf_cache():
+    """Rendered-PDF cache: PDF_CACHE_MB of memory, plus PDF_CACHE_PATH on disk."""
+    memory = MemoryCache(max_entries=int(os.getenv("PDF_CACHE_SIZE", 1000)),
+                         max_bytes=int(float(os.getenv("PDF_CACHE_MB", 64)) * 2**20))
+    path = os.getenv("PDF_CACHE_PATH")
+    if not path:
+        return memory
+    return TieredCache(memory, DiskCache(writable_path(path), max_entries=int(os.getenv(
+        "PDF_CACHE_DISK_SIZE", 20000))))
@@ -0,0 +1,402 @@
+"""Resume and cover letter exports other than PDF: DOCX, Markdown, HTML and
+plain ATS text, all from the ``parse_structured`` dict.
+
+One walker per document drives a writer; every format implements the same
+small interface and returns the finished file from ``finish``:
+
+  header(name, contact)   name and contact details
+  section(title)          section heading
+  entry(title, aside)     e.g. company and location on one line
+  subline(text)           role / degree under an entry
+  meta(text)              dates, grade
+  paragraph(text)
+  bullet(text)
+
+Sections follow the resume template's order and titles (``pdf_templates``),
+so a DOCX matches the PDF it sits next to. Like ``pdf_builder`` this module
+has no Flask or Groq imports, so it runs in the render pool's workers.
+"""
+import io, re, zipfile
+from collections import namedtuple
+from html import escape as html_escape
+from xml.sax.saxutils import escape as xml_escape
+
+import pdf_templates
+from pdf_templates import CLEAN_CHARS
+from resume_parser import parse_output
+
+# Bump when any exported format changes, so cached files are not reused.
+EXPORT_VERSION = 1
+
+CONTACT_FIELDS = ("phone", "email", "linkedin", "location")
+BOLD_MARKUP    = re.compile(r"\*\*(.+?)\*\*")
+
+
+# ─────────────────────────────────────────────────────────────
+#  PLAIN TEXT — what ATS upload boxes parse best
+# ─────────────────────────────────────────────────────────────
+class TextWriter:
+    def __init__(self):
+        self.lines, self.heading = [], False
+
+    def add(self, text):
+        # ASCII punctuation only; parsers choke on smart quotes and bullets.
+        self.lines.append(text.translate(CLEAN_CHARS))
+        self.heading = False
+
+    def gap(self):
+        # Blank line between blocks, but not straight under a heading
+        if self.lines and self.lines[-1] and not self.heading:
+            self.lines.append("")
+
+    def header(self, name, contact):
+        self.add(name)
+        if contact:
+            self.add(" | ".join(contact))
+
+    def section(self, title):
+        self.lines.append("")
+        self.add(title.upper())
+        self.heading = True
+
+    def entry(self, title, aside):
+        self.gap()
+        self.add(" | ".join(filter(None, [title, aside])))
+
+    def subline(self, text):
+        self.add(text)
+
+    meta = subline
+
+    def paragraph(self, text):
+        self.gap()
+        self.add(text)
+
+    def bullet(self, text):
+        self.add("- " + text)
+
+    def finish(self):
+        return ("\n".join(self.lines).strip() + "\n").encode("utf-8")
+
+
+# ─────────────────────────────────────────────────────────────
+#  MARKDOWN
+# ─────────────────────────────────────────────────────────────
+MD_SPECIAL = re.compile(r"([\\`*_\[\]<>#])")
+
+def md(text):
+    return MD_SPECIAL.sub(r"\\\1", text)
+
+class MarkdownWriter:
+    def __init__(self):
+        self.lines = []
+
+    def header(self, name, contact):
+        self.lines.append("# " + md(name))
+        if contact:
+            self.lines += ["", " · ".join(md(c) for c in contact)]
+
+    def section(self, title):
+        self.lines += ["", "## " + md(title), ""]
+
+    def entry(self, title, aside):
+        if self.lines[-1]:
+            self.lines.append("")
+        # Trailing double space: hard line break inside the entry
+        self.lines.append(f"**{md(title)}**" + (f" · {md(aside)}" if aside else "") + "  ")
+
+    def subline(self, text):
+        self.lines.append(f"*{md(text)}*  ")
+
+    def meta(self, text):
+        self.lines.append(md(text) + "  ")
+
+    def paragraph(self, text):
+        if self.lines[-1]:
+            self.lines.append("")
+        self.lines.append(md(text))
+
+    def bullet(self, text):
+        self.lines.append("- " + md(text))
+
+    def finish(self):
+        return ("\n".join(self.lines).strip() + "\n").encode("utf-8")
+
+
+# ─────────────────────────────────────────────────────────────
+#  HTML — one self-contained page
+# ─────────────────────────────────────────────────────────────
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body{{font:15px/1.45 Helvetica,Arial,sans-serif;color:#333;max-width:780px;margin:32px auto;padding:0 20px}}
+h1{{font-size:28px;margin:0;color:#111}} .contact{{color:#555;margin:4px 0 18px}}
+h2{{font-size:15px;margin:20px 0 6px;padding-bottom:3px;border-bottom:1px solid #aaa;color:#111}}
+.entry{{display:flex;justify-content:space-between;margin-top:8px;font-weight:bold;color:#111}}
+.entry span{{font-weight:normal;font-style:italic;color:#777}}
+.sub{{font-style:italic}} .meta{{color:#777;font-size:13px}} p{{margin:4px 0}} ul{{margin:4px 0 4px 18px;padding:0}}
+</style></head><body>
+{body}
+</body></html>
+"""
+
+class HtmlWriter:
+    def __init__(self):
+        self.parts, self.title, self.in_list = [], "", False
+
+    def add(self, html):
+        if self.in_list:
+            self.parts.append("</ul>")
+            self.in_list = False
+        self.parts.append(html)
+
+    def header(self, name, contact):
+        self.title = name
+        self.add(f"<h1>{html_escape(name)}</h1>")
+        if contact:
+            self.add('<div class="contact">' + " &middot; ".join(map(html_escape, contact)) + "</div>")
+
+    def section(self, title):
+        self.add(f"<h2>{html_escape(title)}</h2>")
+
+    def entry(self, title, aside):
+        self.add(f'<div class="entry">{html_escape(title)}<span>{html_escape(aside)}</span></div>')
+
+    def subline(self, text):
+        self.add(f'<div class="sub">{html_escape(text)}</div>')
+
+    def meta(self, text):
+        self.add(f'<div class="meta">{html_escape(text)}</div>')
+
+    def paragraph(self, text):
+        self.add(f"<p>{html_escape(text)}</p>")
+
+    def bullet(self, text):
+        if not self.in_list:
+            self.add("<ul>")
+            self.in_list = True
+        self.parts.append(f"<li>{html_escape(text)}</li>")
+
+    def finish(self):
+        self.add("")
+        return HTML_PAGE.format(title=html_escape(self.title),
+                                body="\n".join(self.parts).strip()).encode("utf-8")
+
+
+# ─────────────────────────────────────────────────────────────
+#  DOCX — minimal WordprocessingML package, no extra dependency
+# ─────────────────────────────────────────────────────────────
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+TEXT_W = 9638    # A4 width minus 2 cm margins, in twips; right tab for asides
+
+DOCX_PARTS = {
+    "[Content_Types].xml": XML_DECL +
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '<Override PartName="/word/styles.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+        '<Override PartName="/word/numbering.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>'
+        '</Types>',
+    "_rels/.rels": XML_DECL +
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/officeDocument" Target="word/document.xml"/></Relationships>',
+    "word/_rels/document.xml.rels": XML_DECL +
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/styles" Target="styles.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/numbering" Target="numbering.xml"/></Relationships>',
+    "word/styles.xml": XML_DECL + f'<w:styles {W_NS}>'
+        '<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" '
+        'w:cs="Calibri"/><w:color w:val="333333"/><w:sz w:val="21"/></w:rPr></w:rPrDefault>'
+        '<w:pPrDefault><w:pPr><w:spacing w:after="40" w:line="264" w:lineRule="auto"/>'
+        '</w:pPr></w:pPrDefault></w:docDefaults>'
+        '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/>'
+        '<w:basedOn w:val="Normal"/><w:rPr><w:b/><w:color w:val="0F0F0F"/><w:sz w:val="40"/></w:rPr></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/>'
+        '<w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:pPr><w:keepNext/>'
+        '<w:spacing w:before="240" w:after="80"/><w:pBdr><w:bottom w:val="single" w:sz="4" '
+        'w:space="1" w:color="A0A0A0"/></w:pBdr><w:outlineLvl w:val="0"/></w:pPr>'
+        '<w:rPr><w:b/><w:color w:val="0F0F0F"/><w:sz w:val="23"/></w:rPr></w:style>'
+        '<w:style w:type="paragraph" w:styleId="ListBullet"><w:name w:val="List Bullet"/>'
+        '<w:basedOn w:val="Normal"/><w:pPr><w:numPr><w:numId w:val="1"/></w:numPr>'
+        '<w:ind w:left="360" w:hanging="240"/></w:pPr></w:style>'
+        '</w:styles>',
+    "word/numbering.xml": XML_DECL + f'<w:numbering {W_NS}>'
+        '<w:abstractNum w:abstractNumId="0"><w:lvl w:ilvl="0"><w:start w:val="1"/>'
+        '<w:numFmt w:val="bullet"/><w:lvlText w:val="•"/><w:lvlJc w:val="left"/>'
+        '<w:pPr><w:ind w:left="360" w:hanging="240"/></w:pPr></w:lvl></w:abstractNum>'
+        '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num></w:numbering>',
+}
+DOCX_SECT = ('<w:sectPr><w:pgSz w:w="11906" w:h="16838"/><w:pgMar w:top="1134" '
+             'w:right="1134" w:bottom="1134" w:left="1134" w:header="709" w:footer="709" '
+             'w:gutter="0"/></w:sectPr>')
+XML_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def _run(text, rpr=""):
+    text = xml_escape(XML_ILLEGAL.sub("", text))
+    return f'<w:r>{"<w:rPr>" + rpr + "</w:rPr>" if rpr else ""}<w:t xml:space="preserve">{text}</w:t></w:r>'
+
+class DocxWriter:
+    def __init__(self):
+        self.paras = []
+
+    def add(self, runs, style=None, ppr=""):
+        if style:
+            ppr = f'<w:pStyle w:val="{style}"/>' + ppr
+        self.paras.append(f'<w:p>{"<w:pPr>" + ppr + "</w:pPr>" if ppr else ""}{runs}</w:p>')
+
+    def header(self, name, contact):
+        self.add(_run(name), "Title")
+        if contact:
+            self.add(_run("  |  ".join(contact), '<w:color w:val="3C3C3C"/><w:sz w:val="18"/>'),
+                     ppr='<w:spacing w:after="120"/>')
+
+    def section(self, title):
+        self.add(_run(title), "Heading1")
+
+    def entry(self, title, aside):
+        runs = _run(title, '<w:b/><w:color w:val="0F0F0F"/>')
+        if aside:
+            runs += "<w:r><w:tab/></w:r>" + _run(aside, '<w:i/><w:color w:val="6E6E6E"/>')
+        self.add(runs, ppr=f'<w:keepNext/><w:tabs><w:tab w:val="right" w:pos="{TEXT_W}"/>'
+                           '</w:tabs><w:spacing w:before="120" w:after="0"/>')
+
+    def subline(self, text):
+        self.add(_run(text, "<w:b/>"), ppr='<w:keepNext/><w:spacing w:after="0"/>')
+
+    def meta(self, text):
+        self.add(_run(text, '<w:color w:val="6E6E6E"/><w:sz w:val="18"/>'))
+
+    def paragraph(self, text):
+        self.add(_run(text))
+
+    def bullet(self, text):
+        self.add(_run(text), "ListBullet")
+
+    def finish(self):
+        document = (XML_DECL + f'<w:document {W_NS}><w:body>' + "".join(self.paras) +
+                    DOCX_SECT + "</w:body></w:document>")
+        return zip_bytes(list(DOCX_PARTS.items()) + [("word/document.xml", document)])
+
+
+def zip_bytes(files):
+    """Deflated ZIP of ``[(name, str | bytes), ...]``. Entries carry a fixed
+    timestamp, so the same content always gives the same bytes."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files:
+            zf.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), data,
+                        compress_type=zipfile.ZIP_DEFLATED)
+    return buf.getvalue()
+
+
+Format = namedtuple("Format", "mime writer")
+
+FORMATS = {
+    "docx": Format("application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                   DocxWriter),
+    "md":   Format("text/markdown; charset=utf-8", MarkdownWriter),
+    "html": Format("text/html; charset=utf-8", HtmlWriter),
+    "txt":  Format("text/plain; charset=utf-8", TextWriter),
+}
+
+
+# ─────────────────────────────────────────────────────────────
+#  DOCUMENT WALKERS
+# ─────────────────────────────────────────────────────────────
+def _summary(w, data, title):
+    summary = data.get("summary","").strip()
+    if summary:
+        w.section(title)
+        w.paragraph(summary)
+
+def _skills(w, data, title):
+    skills = [s.strip() for s in data.get("skills",[]) if s.strip()]
+    if skills:
+        w.section(title)
+        w.paragraph(", ".join(skills))
+
+def _education(w, data, title):
+    if not data.get("education"): return
+    w.section(title)
+    for edu in data["education"]:
+        w.entry(edu.get("institution",""), edu.get("location",""))
+        if edu.get("degree"):
+            w.subline(edu["degree"])
+        sub = "  |  ".join(filter(None, [edu.get("year",""), edu.get("grade","")]))
+        if sub:
+            w.meta(sub)
+
+def _experience(w, data, title):
+    if not data.get("experience"): return
+    w.section(title)
+    for exp in data["experience"]:
+        end   = exp.get("end","")
+        dates = (exp.get("start","") + (" - " + end if end else "")).strip()
+        w.entry(exp.get("company",""), exp.get("location",""))
+        if exp.get("role"):
+            w.subline(exp["role"])
+        if dates:
+            w.meta(dates)
+        for b in exp.get("bullets",[]):
+            w.bullet(b)
+
+def _projects(w, data, title):
+    if not data.get("projects"): return
+    w.section(title)
+    for proj in data["projects"]:
+        w.entry(proj.get("name",""), proj.get("tech",""))
+        for b in proj.get("bullets",[]):
+            w.bullet(b)
+
+def _certifications(w, data, title):
+    if not data.get("certifications"): return
+    w.section(title)
+    for c in data["certifications"]:
+        w.bullet(c)
+
+def _languages(w, data, title):
+    langs = [l.strip() for l in data.get("languages",[]) if l.strip()]
+    if langs:
+        w.section(title)
+        w.paragraph(", ".join(langs))
+
+SECTIONS = {
+    "summary": _summary, "skills": _skills, "education": _education,
+    "experience": _experience, "projects": _projects,
+    "certifications": _certifications, "languages": _languages,
+}
+
+def write_resume(w, data, template=None):
+    w.header(data.get("name") or "Your Name",
+             [data[k] for k in CONTACT_FIELDS if data.get(k)])
+    for key, title in pdf_templates.get(template).sections:
+        SECTIONS[key](w, data, title)
+    return w.finish()
+
+def write_cover(w, name, job_title, content):
+    w.header(name, [f"Cover Letter - {job_title}"] if job_title else [])
+    for raw in content.split("\n"):
+        s = BOLD_MARKUP.sub(r"\1", raw.strip())
+        if s:
+            w.paragraph(s)
+    return w.finish()
+
+
+# ─────────────────────────────────────────────────────────────
+#  ENTRY POINTS — module-level so the render pool can run them
+# ─────────────────────────────────────────────────────────────
+def render_resume(fmt, structured, template=None):
+    return write_resume(FORMATS[fmt].writer(), structured, template)
+
+def render_cover(fmt, output, name, job_title):
+    _, cover_text = parse_output(output)
+    return write_cover(FORMATS[fmt].writer(), name, job_title, cover_text)
@@ -0,0 +1,352 @@
+"""Storage backends for generated resume history.
+
+The app talks to a ``HistoryStore``; which one it gets is picked by the
+``HISTORY_BACKEND`` env var:
+
+  sqlite (default)  indexed SQLite file in WAL mode, O(1) inserts and
+                    id lookups, deletes touch only the affected rows
+  json              the original single ``resumes_db.json`` file, guarded
+                    by an exclusive lock file and rewritten atomically
+
+Both backends are safe to share between gunicorn worker processes.
+Records are plain dicts shaped like the ones ``generate()`` builds.
+``LazyStore`` opens the backend on first use; a file whose directory is
+read-only (serverless deploy dirs) is kept in the temp dir instead.
+
+Listings are paged: ``list_summaries`` returns one page of summary dicts
+(newest first) plus an opaque cursor for the next page, optionally
+filtered by name / job_title (substring), template (exact) and a
+created_at range (inclusive string prefixes, e.g. "2024-01" .. "2024-03").
+
+Migrate an existing JSON history once with:
+
+    python history_store.py migrate [resumes_db.json] [resumes_db.sqlite3]
+"""
+import os, sys, json, tempfile, threading
+from contextlib import contextmanager
+
+from sqlite_conn import LocalConnection, writable_path
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+SUMMARY_FIELDS = ("id", "name", "job_title", "template", "created_at")
+FILTER_FIELDS  = ("name", "job_title", "template", "created_from", "created_to")
+
+
+class HistoryStore:
+    def insert(self, record):
+        raise NotImplementedError
+
+    def insert_missing(self, records):
+        """Insert records whose id is not stored yet; returns how many were."""
+        raise NotImplementedError
+
+    def get(self, rid):
+        raise NotImplementedError
+
+    def update(self, rid, **fields):
+        """Merge ``fields`` into a stored record; False if it does not exist."""
+        raise NotImplementedError
+
+    def delete(self, rid):
+        raise NotImplementedError
+
+    def list_summaries(self, limit=50, cursor=None, filters=None):
+        """Return ``(summaries, next_cursor)``; next_cursor is None at the end."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+def summary_of(record):
+    return {k: record.get(k, "") for k in SUMMARY_FIELDS}
+
+
+def matches(summary, filters):
+    """Python twin of the SQLite WHERE clause, used by the JSON backend."""
+    f = filters or {}
+    if f.get("name") and f["name"].lower() not in summary["name"].lower():
+        return False
+    if f.get("job_title") and f["job_title"].lower() not in summary["job_title"].lower():
+        return False
+    if f.get("template") and summary["template"] != f["template"]:
+        return False
+    if f.get("created_from") and summary["created_at"] < f["created_from"]:
+        return False
+    # "~" sorts after every character of a timestamp, so "2024-03" keeps
+    # all of March.
+    if f.get("created_to") and summary["created_at"] > f["created_to"] + "~":
+        return False
+    return True
+
+
+# ─────────────────────────────────────────────────────────────
+#  SQLITE (WAL) — summaries and bodies kept in separate tables
+# ─────────────────────────────────────────────────────────────
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    id         TEXT NOT NULL UNIQUE,
+    name       TEXT NOT NULL DEFAULT '',
+    job_title  TEXT NOT NULL DEFAULT '',
+    template   TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS record_bodies (
+    id   TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_template   ON records (template, seq);
+CREATE INDEX IF NOT EXISTS records_created_at ON records (created_at);
+"""
+
+
+def _like(text):
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class SQLiteHistoryStore(HistoryStore):
+    def __init__(self, path):
+        self.path  = path
+        self._conn = LocalConnection(path)
+        with self._write() as conn:
+            for stmt in SCHEMA.split(";"):
+                if stmt.strip(): conn.execute(stmt)
+
+    @contextmanager
+    def _write(self):
+        # Take the write lock up front so concurrent writers queue on
+        # busy_timeout instead of failing on a lock upgrade.
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _insert(self, conn, record, verb="INSERT"):
+        s = summary_of(record)
+        cur = conn.execute(
+            f"{verb} INTO records (id,name,job_title,template,created_at) "
+            "VALUES (?,?,?,?,?)",
+            (s["id"], s["name"], s["job_title"], s["template"], s["created_at"]))
+        if cur.rowcount:
+            conn.execute("INSERT OR REPLACE INTO record_bodies (id,body) VALUES (?,?)",
+                         (s["id"], json.dumps(record)))
+        return cur.rowcount
+
+    def insert(self, record):
+        with self._write() as conn:
+            self._insert(conn, record)
+
+    def insert_missing(self, records):
+        with self._write() as conn:
+            return sum(self._insert(conn, r, "INSERT OR IGNORE") for r in records)
+
+    def get(self, rid):
+        row = self._conn().execute(
+            "SELECT body FROM record_bodies WHERE id=?", (rid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, rid, **fields):
+        with self._write() as conn:
+            row = conn.execute("SELECT body FROM record_bodies WHERE id=?",
+                               (rid,)).fetchone()
+            if row is None:
+                return False
+            record = json.loads(row[0]); record.update(fields)
+            conn.execute("UPDATE record_bodies SET body=? WHERE id=?",
+                         (json.dumps(record), rid))
+            s = summary_of(record)
+            conn.execute("UPDATE records SET name=?,job_title=?,template=?,created_at=? "
+                         "WHERE id=?", (s["name"], s["job_title"], s["template"],
+                                        s["created_at"], rid))
+        return True
+
+    def delete(self, rid):
+        with self._write() as conn:
+            cur = conn.execute("DELETE FROM records WHERE id=?", (rid,))
+            conn.execute("DELETE FROM record_bodies WHERE id=?", (rid,))
+        return cur.rowcount > 0
+
+    def list_summaries(self, limit=50, cursor=None, filters=None):
+        f = filters or {}
+        where, args = [], []
+        if cursor:
+            where.append("seq < ?"); args.append(int(cursor))
+        if f.get("name"):
+            where.append("name LIKE ? ESCAPE '\\'"); args.append(_like(f["name"]))
+        if f.get("job_title"):
+            where.append("job_title LIKE ? ESCAPE '\\'"); args.append(_like(f["job_title"]))
+        if f.get("template"):
+            where.append("template = ?"); args.append(f["template"])
+        if f.get("created_from"):
+            where.append("created_at >= ?"); args.append(f["created_from"])
+        if f.get("created_to"):
+            where.append("created_at <= ?"); args.append(f["created_to"] + "~")
+        sql = "SELECT seq,id,name,job_title,template,created_at FROM records"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # Keyset pagination on seq: every page is an index range scan,
+        # however deep into history it is.
+        sql += " ORDER BY seq DESC LIMIT ?"
+        rows = self._conn().execute(sql, args + [limit + 1]).fetchall()
+        page = [dict(zip(SUMMARY_FIELDS, r[1:])) for r in rows[:limit]]
+        nxt  = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return page, nxt
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+
+# ─────────────────────────────────────────────────────────────
+#  JSON — legacy whole-file store, newest record first
+# ─────────────────────────────────────────────────────────────
+class JsonHistoryStore(HistoryStore):
+    def __init__(self, path):
+        self.path  = path
+        self.mutex = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        # Read-modify-write cycles hold an exclusive lock on a sidecar file
+        # so no worker process can interleave its own cycle.
+        with self.mutex, open(self.path + ".lock", "a") as lock:
+            if fcntl: fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl: fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, data):
+        # Write a temp file next to the target and rename it into place, so
+        # readers only ever see the old or the new file, never a torn one.
+        d = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".resumes_db.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush(); os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+
+    def insert(self, record):
+        with self._locked():
+            db = self.load(); db.insert(0, record); self.save(db)
+
+    def insert_missing(self, records):
+        with self._locked():
+            db = self.load()
+            seen = {r["id"] for r in db}
+            new = [r for r in records if r["id"] not in seen]
+            # ``records`` is oldest first; the file is newest first.
+            self.save(new[::-1] + db)
+        return len(new)
+
+    def get(self, rid):
+        return next((x for x in self.load() if x["id"] == rid), None)
+
+    def update(self, rid, **fields):
+        with self._locked():
+            db = self.load()
+            record = next((r for r in db if r["id"] == rid), None)
+            if record is None:
+                return False
+            record.update(fields); self.save(db)
+        return True
+
+    def delete(self, rid):
+        with self._locked():
+            db = self.load()
+            keep = [r for r in db if r["id"] != rid]
+            if len(keep) != len(db): self.save(keep)
+        return len(keep) != len(db)
+
+    def list_summaries(self, limit=50, cursor=None, filters=None):
+        rows = [summary_of(r) for r in self.load()]
+        if cursor:
+            # Cursor is the id of the last record on the previous page.
+            idx  = next((i for i, r in enumerate(rows) if r["id"] == cursor), len(rows))
+            rows = rows[idx + 1:]
+        rows = [r for r in rows if matches(r, filters)]
+        page = rows[:limit]
+        return page, (page[-1]["id"] if len(rows) > limit else None)
+
+    def __len__(self):
+        return len(self.load())
+
+
+# ─────────────────────────────────────────────────────────────
+#  FACTORY + MIGRATION
+# ─────────────────────────────────────────────────────────────
+JSON_FILE   = os.getenv("HISTORY_JSON", "resumes_db.json")
+SQLITE_FILE = os.getenv("HISTORY_DB", "resumes_db.sqlite3")
+
+
+def migrate_json(json_path, store):
+    """Copy every record of a legacy JSON history into ``store``.
+
+    Records already present (same id) are skipped, so re-running is safe.
+    Returns the number of records copied.
+    """
+    records = JsonHistoryStore(json_path).load()
+    # The JSON file is newest-first; insert oldest first to keep the order.
+    return store.insert_missing(records[::-1])
+
+
+def open_store(backend=None):
+    backend = (backend or os.getenv("HISTORY_BACKEND", "sqlite")).lower()
+    if backend == "json":
+        return JsonHistoryStore(writable_path(JSON_FILE))
+    if backend != "sqlite":
+        raise ValueError(f"Unknown HISTORY_BACKEND: {backend}")
+    store = SQLiteHistoryStore(writable_path(SQLITE_FILE))
+    # First start after upgrading: pick up the old JSON history once.
+    if os.path.exists(JSON_FILE) and len(store) == 0:
+        migrate_json(JSON_FILE, store)
+    return store
+
+
+class LazyStore:
+    """The store from ``opener`` (default ``open_store``), opened on first
+    use so that importing the app never touches the disk."""
+    def __init__(self, opener=open_store):
+        self.opener = opener
+        self.store  = None
+        self.mutex  = threading.Lock()
+
+    def backend(self):
+        if self.store is None:
+            with self.mutex:
+                if self.store is None:
+                    self.store = self.opener()
+        return self.store
+
+    def __getattr__(self, name):
+        return getattr(self.backend(), name)
+
+    def __len__(self):
+        return len(self.backend())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print(__doc__.strip()); sys.exit(1)
+    src = sys.argv[2] if len(sys.argv) > 2 else JSON_FILE
+    dst = sys.argv[3] if len(sys.argv) > 3 else SQLITE_FILE
+    n = migrate_json(src, SQLiteHistoryStore(dst))
+    print(f"Migrated {n} record(s) from {src} to {dst}")
@@ -0,0 +1,211 @@
+"""Background generation jobs with a local worker pool.
+
+``POST /jobs`` enqueues a payload and returns straight away; a small pool of
+worker threads in the same process runs it. Job state lives in a SQLite
+file (``JOBS_DB``), so any gunicorn worker can answer ``GET /jobs/<id>``
+no matter which one accepted the job. The file is only opened once a job
+route is used.
+
+Status flow: queued → running → done | failed, with ``retrying`` in between
+when the model rate-limits us. Retries back off exponentially (honouring a
+Retry-After header when Groq sends one) and are re-queued from a timer, so
+a backing-off job does not hold a worker.
+
+The queue is bounded; ``submit`` raises ``QueueFull`` once it is, and the
+route answers 503 instead of letting the backlog grow without limit.
+
+The queue itself is process memory. A job whose process was recycled
+(gunicorn max_requests, a serverless freeze) would sit at queued / running
+forever, so ``JobStore.get`` fails any unfinished job that has not moved for
+``stale_after`` seconds (JOB_STALE_SECONDS).
+
+Callback URLs must resolve to public addresses (``check_callback``), checked
+when the job is submitted and again before the POST, and redirects are not
+followed: a caller cannot aim the server at localhost, the LAN or the cloud
+metadata service. Hosts listed in JOB_CALLBACK_HOSTS skip the address check.
+"""
+import os, json, uuid, queue, random, socket, ipaddress, threading, logging
+import urllib.request, urllib.parse
+from datetime import datetime, timedelta
+
+from sqlite_conn import LocalConnection
+
+log = logging.getLogger(__name__)
+
+QueueFull = queue.Full
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    status       TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    created_at   TEXT NOT NULL,
+    updated_at   TEXT NOT NULL,
+    callback_url TEXT,
+    result       TEXT,
+    error        TEXT
+) WITHOUT ROWID
+"""
+
+
+def _now(offset=0):
+    return (datetime.now() - timedelta(seconds=offset)).strftime("%Y-%m-%d %H:%M:%S")
+
+UNFINISHED = ("queued", "running", "retrying")
+
+
+CALLBACK_HOSTS = {h.strip().lower() for h in os.getenv("JOB_CALLBACK_HOSTS", "").split(",")
+                  if h.strip()}
+
+
+def check_callback(url):
+    """Raise ValueError unless ``url`` is http(s) to a public address."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    if parts.hostname.lower() in CALLBACK_HOSTS:
+        return
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or 80,
+                                   proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError):
+        raise ValueError(f"callback_url host {parts.hostname} does not resolve")
+    for info in infos:
+        ip = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError("callback_url must point to a public address")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # A public callback must not bounce the POST to an internal address.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+class JobStore:
+    def __init__(self, path, stale_after=900):
+        self.path, self.stale_after = path, stale_after
+        self._conn = LocalConnection(path)
+        self._conn().execute(SCHEMA)
+
+    def create(self, job_id, callback_url=None):
+        now = _now()
+        self._conn().execute(
+            "INSERT INTO jobs (id,status,created_at,updated_at,callback_url) "
+            "VALUES (?,?,?,?,?)", (job_id, "queued", now, now, callback_url))
+
+    def update(self, job_id, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = _now()
+        cols = ",".join(f"{k}=?" for k in fields)
+        self._conn().execute(f"UPDATE jobs SET {cols} WHERE id=?",
+                             list(fields.values()) + [job_id])
+
+    def get(self, job_id):
+        if self.stale_after:
+            # Lost with its process; only matches while the job is unfinished.
+            self._conn().execute(
+                "UPDATE jobs SET status='failed', error=?, updated_at=? "
+                f"WHERE id=? AND status IN ({','.join('?' * len(UNFINISHED))}) "
+                "AND updated_at < ?",
+                ("Job lost: the worker running it stopped", _now(), job_id,
+                 *UNFINISHED, _now(self.stale_after)))
+        cur = self._conn().execute("SELECT * FROM jobs WHERE id=?", (job_id,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        job = dict(zip([c[0] for c in cur.description], row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class JobQueue:
+    def __init__(self, run, open_store, workers=4, max_queue=100,
+                 max_attempts=4, backoff=2.0, max_backoff=60.0,
+                 retryable=lambda e: False):
+        self.run, self.open_store = run, open_store
+        self._store       = None
+        self.workers      = workers
+        self.max_attempts = max_attempts
+        self.backoff      = backoff
+        self.max_backoff  = max_backoff
+        self.retryable    = retryable     # exception -> bool
+        self.queue   = queue.Queue(maxsize=max_queue)
+        self.started = False
+        self.mutex   = threading.Lock()
+
+    @property
+    def store(self):
+        """The ``JobStore``, built by ``open_store()`` on first use so that
+        a process that never sees a job never creates the jobs file."""
+        if self._store is None:
+            with self.mutex:
+                if self._store is None:
+                    self._store = self.open_store()
+        return self._store
+
+    def _start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f"job-worker-{i}",
+                             daemon=True).start()
+        self.started = True
+
+    def submit(self, payload, callback_url=None):
+        with self.mutex:
+            if not self.started:
+                self._start()
+        job_id = uuid.uuid4().hex[:12]
+        self.store.create(job_id, callback_url)
+        try:
+            self.queue.put_nowait((job_id, payload, callback_url, 1))
+        except QueueFull:
+            self.store.update(job_id, status="failed", error="Queue full")
+            raise
+        return job_id
+
+    def _delay(self, attempt, exc):
+        retry_after = getattr(getattr(exc, "response", None), "headers", {}).get("retry-after")
+        try:
+            return min(float(retry_after), self.max_backoff)
+        except (TypeError, ValueError):
+            base = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+            return base * (0.5 + random.random() / 2)
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            # Nothing may end the thread: a dead worker shrinks the pool for good.
+            try:
+                self._run_one(*item)
+            except Exception:
+                log.exception("Job worker error on job %s", item[0])
+
+    def _run_one(self, job_id, payload, callback_url, attempt):
+        self.store.update(job_id, status="running", attempts=attempt)
+        try:
+            result = self.run(payload)
+        except Exception as e:
+            if attempt < self.max_attempts and self.retryable(e):
+                delay = self._delay(attempt, e)
+                self.store.update(job_id, status="retrying", error=str(e))
+                threading.Timer(delay, self.queue.put,
+                                [(job_id, payload, callback_url, attempt + 1)]).start()
+                return
+            log.exception("Job %s failed", job_id)
+            self.store.update(job_id, status="failed", error=str(e))
+        else:
+            self.store.update(job_id, status="done", result=result, error=None)
+        if callback_url:
+            self._notify(callback_url, self.store.get(job_id))
+
+    def _notify(self, url, job):
+        req = urllib.request.Request(url, data=json.dumps(job).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+        try:
+            check_callback(url)     # DNS may have changed since submit
+            _opener.open(req, timeout=10).close()
+        except Exception:
+            log.warning("Callback to %s for job %s failed", url, job["id"], exc_info=True)
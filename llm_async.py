@@ -0,0 +1,47 @@
+"""Bounded async execution of Groq chat completions, for asgi.py.
+
+``AsyncLLMRunner.run(**kwargs)`` awaits ``call(**kwargs)``, normally
+``LLMGateway.acreate``: one ``AsyncGroq`` client behind the same retry /
+deadline / breaker / fallback policy as sync calls. Every in-flight
+generation in the process shares one connection pool and costs a coroutine,
+not a thread.
+
+At most ``max_concurrency`` calls run against Groq at once (an asyncio
+semaphore); up to ``max_queue`` more may wait for a slot. Anything beyond
+that is refused with ``Overloaded`` so callers can shed load fast rather
+than pile up behind a slow upstream. A cancelled call (client gone, server
+shutting down) gives its slot back.
+
+The runner lives on the event loop of the process that first awaits it
+(one per uvicorn worker). It is not thread-safe; the sync app never uses it.
+"""
+
+
+class Overloaded(Exception):
+    """Raised by ``run`` when the concurrency + queue budget is used up."""
+
+
+class AsyncLLMRunner:
+    def __init__(self, call, max_concurrency=32, max_queue=256):
+        self.call            = call
+        self.max_concurrency = max_concurrency
+        self.max_queue       = max_queue
+        self.pending = 0            # running + waiting for a slot
+        self.sem     = None
+
+    async def run(self, **kwargs):
+        if self.sem is None:
+            import asyncio
+            self.sem = asyncio.Semaphore(self.max_concurrency)
+        if self.pending >= self.max_concurrency + self.max_queue:
+            raise Overloaded(f"{self.pending} generations already in flight")
+        self.pending += 1
+        try:
+            async with self.sem:
+                return await self.call(**kwargs)
+        finally:
+            self.pending -= 1
+
+    def stats(self):
+        return {"pending": self.pending, "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue}
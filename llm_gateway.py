@@ -0,0 +1,289 @@
+"""Resilient wrapper around the Groq clients.
+
+``LLMGateway`` has the same ``chat.completions.create(**kwargs)`` surface as
+``Groq`` (and ``acreate`` for ``AsyncGroq``) and adds, per call:
+
+  deadline   the whole call (all attempts and back-off sleeps) must finish
+             within ``deadline`` seconds; each attempt gets what is left as
+             its HTTP timeout
+  retries    429, 5xx, timeouts and connection errors are retried with
+             full-jitter exponential back-off, honouring Retry-After
+  breaker    after ``failure_threshold`` consecutive upstream failures a
+             model's circuit opens for ``cooldown`` seconds; calls fail fast
+             with ``CircuitOpen`` instead of queueing behind a dead upstream
+  fallback   if the primary model is exhausted or its circuit is open, the
+             call is retried once on ``fallback_model``
+
+Client errors (400, 401, 404, ...) are raised straight away and do not count
+against the breaker. For ``stream=True`` only opening the stream is retried.
+
+``make_client`` / ``make_async_client`` build the clients on one shared,
+bounded httpx connection pool with the SDK's own retries off (the gateway
+owns them). Pass them as ``client_factory`` / ``async_client_factory`` and
+each client (and the groq/httpx imports) is only built on its first call.
+Sync and async calls share the breakers and counters. Point GROQ_BASE_URL
+at ``bench/fake_groq.py`` to exercise all of this locally.
+"""
+import time, random, threading, logging
+from types import SimpleNamespace
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpen(Exception):
+    """Raised when every model the call may use has an open circuit."""
+    def __init__(self, msg, retry_after):
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+
+def make_client(api_key, pool_size=20, timeout=60.0, connect_timeout=5.0):
+    import httpx
+    from groq import Groq
+    http = httpx.Client(
+        limits=httpx.Limits(max_connections=pool_size,
+                            max_keepalive_connections=pool_size),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout))
+    return Groq(api_key=api_key, http_client=http, max_retries=0)
+
+
+def make_async_client(api_key, pool_size=20, timeout=60.0, connect_timeout=5.0):
+    import httpx
+    from groq import AsyncGroq
+    http = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=pool_size,
+                            max_keepalive_connections=pool_size),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout))
+    return AsyncGroq(api_key=api_key, http_client=http, max_retries=0)
+
+
+def _deadline_error():
+    import httpx
+    from groq import APITimeoutError
+    return APITimeoutError(request=httpx.Request("POST", "deadline"))
+
+
+def is_transient(e):
+    from groq import APIStatusError, APITimeoutError, APIConnectionError, RateLimitError
+    if isinstance(e, (RateLimitError, APITimeoutError, APIConnectionError)):
+        return True
+    return isinstance(e, APIStatusError) and e.status_code >= 500
+
+
+def _retry_after(e):
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold, self.cooldown = failure_threshold, cooldown
+        self.failures  = 0
+        self.opened_at = None
+        self.probing   = False
+        self.mutex = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self):
+        # Half-open lets exactly one probe call through at a time.
+        with self.mutex:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def retry_after(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(self.cooldown - (time.monotonic() - self.opened_at), 0.0)
+
+    def success(self):
+        with self.mutex:
+            self.failures, self.opened_at, self.probing = 0, None, False
+
+    def failure(self):
+        with self.mutex:
+            self.failures += 1
+            # A failed probe re-opens at once; otherwise open on the threshold.
+            if self.probing or (self.opened_at is None and
+                                self.failures >= self.failure_threshold):
+                log.warning("LLM circuit open after %d failures", self.failures)
+                self.opened_at, self.probing = time.monotonic(), False
+
+
+class LLMGateway:
+    def __init__(self, client=None, fallback_model=None, max_attempts=3, deadline=60.0,
+                 backoff=0.5, max_backoff=8.0, failure_threshold=5, cooldown=30.0,
+                 client_factory=None, async_client_factory=None):
+        self._client        = client
+        self.client_factory = client_factory
+        self._async_client  = None
+        self.async_client_factory = async_client_factory
+        self.fallback_model = fallback_model
+        self.max_attempts   = max_attempts
+        self.deadline       = deadline
+        self.backoff, self.max_backoff = backoff, max_backoff
+        self.breaker_args   = (failure_threshold, cooldown)
+        self.breakers = {}
+        self.counts   = {"calls": 0, "retries": 0, "fallbacks": 0, "failures": 0,
+                         "short_circuited": 0}
+        self.mutex = threading.Lock()
+        self.chat  = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self.mutex:
+                if self._client is None:
+                    self._client = self.client_factory()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @property
+    def async_client(self):
+        # Built on the event loop's thread, on the first acreate().
+        if self._async_client is None:
+            with self.mutex:
+                if self._async_client is None:
+                    self._async_client = self.async_client_factory()
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, client):
+        self._async_client = client
+
+    def breaker(self, model):
+        with self.mutex:
+            if model not in self.breakers:
+                self.breakers[model] = CircuitBreaker(*self.breaker_args)
+            return self.breakers[model]
+
+    def _count(self, key):
+        with self.mutex:
+            self.counts[key] += 1
+
+    def _models(self, model):
+        if self.fallback_model and self.fallback_model != model:
+            return [model, self.fallback_model]
+        return [model]
+
+    def _admit(self, model, n, error):
+        """``model``'s breaker if the call may try it now, else None."""
+        breaker = self.breaker(model)
+        if not breaker.allow():
+            self._count("short_circuited")
+            return None
+        if n:
+            self._count("fallbacks")
+            log.warning("Falling back to %s after: %s", model, error)
+        return breaker
+
+    def _retry_delay(self, e, attempt, breaker, end):
+        """Seconds to back off after ``e`` before the next attempt, or None
+        when the caller should re-raise it."""
+        if not is_transient(e):
+            breaker.success()     # upstream answered; it is the request
+            return None
+        breaker.failure()
+        delay = _retry_after(e)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff * 2 ** (attempt - 1),
+                                          self.max_backoff))
+        if (attempt == self.max_attempts or breaker.state != "closed"
+                or time.monotonic() + delay >= end):
+            return None
+        self._count("retries")
+        return delay
+
+    def create(self, **kwargs):
+        self._count("calls")
+        end = time.monotonic() + (kwargs.pop("timeout", None) or self.deadline)
+        error = None
+        for n, model in enumerate(self._models(kwargs["model"])):
+            breaker = self._admit(model, n, error)
+            if breaker is None:
+                error = error or CircuitOpen(f"{model} circuit open",
+                                             self.breaker(model).retry_after())
+                continue
+            try:
+                return self._attempts(dict(kwargs, model=model), breaker, end)
+            except Exception as e:
+                if not is_transient(e):
+                    raise
+                error = e
+        self._count("failures")
+        raise error
+
+    def _attempts(self, kwargs, breaker, end):
+        for attempt in range(1, self.max_attempts + 1):
+            left = end - time.monotonic()
+            if left <= 0:
+                raise _deadline_error()
+            try:
+                result = self.client.chat.completions.create(timeout=left, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, breaker, end)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            breaker.success()
+            return result
+
+    async def acreate(self, **kwargs):
+        """``create`` for the async client, under the same policy."""
+        self._count("calls")
+        end = time.monotonic() + (kwargs.pop("timeout", None) or self.deadline)
+        error = None
+        for n, model in enumerate(self._models(kwargs["model"])):
+            breaker = self._admit(model, n, error)
+            if breaker is None:
+                error = error or CircuitOpen(f"{model} circuit open",
+                                             self.breaker(model).retry_after())
+                continue
+            try:
+                return await self._aattempts(dict(kwargs, model=model), breaker, end)
+            except Exception as e:
+                if not is_transient(e):
+                    raise
+                error = e
+        self._count("failures")
+        raise error
+
+    async def _aattempts(self, kwargs, breaker, end):
+        import asyncio
+        for attempt in range(1, self.max_attempts + 1):
+            left = end - time.monotonic()
+            if left <= 0:
+                raise _deadline_error()
+            try:
+                result = await self.async_client.chat.completions.create(timeout=left, **kwargs)
+            except asyncio.CancelledError:
+                breaker.failure()     # caller gave up waiting, as on a timeout
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, breaker, end)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            breaker.success()
+            return result
+
+    def stats(self):
+        return dict(self.counts, breakers={m: {"state": b.state, "failures": b.failures}
+                                           for m, b in self.breakers.items()})
@@ -0,0 +1,144 @@
+"""Stage timings, Prometheus metrics and Server-Timing headers.
+
+    with span("llm"):
+        ...
+
+times a stage: the duration lands in the ``resume_stage_seconds``
+histogram (label ``stage``) and, inside a request, in the response's
+Server-Timing header so browser devtools show the breakdown. ``install``
+hooks a Flask app up for per-endpoint request histograms and the header;
+``render`` produces the text exposition format served at ``/metrics``.
+
+Metrics are per process. Under gunicorn each worker reports its own
+numbers, so scrape every worker or sum in Prometheus.
+"""
+import time, threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, labels
+        self.values = {}
+        self.mutex  = threading.Lock()
+
+    def inc(self, amount=1, *labels):
+        with self.mutex:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, v in sorted(self.values.items()):
+            out.append(f"{self.name}{_labels(self.labels, key)} {v:g}")
+        return out
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self.series = {}       # labels -> [bucket counts..., sum, count]
+        self.mutex  = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self.mutex:
+            s = self.series.get(labels)
+            if s is None:
+                s = self.series[labels] = [0] * (len(self.buckets) + 2)
+            i = bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self):
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, s in sorted(self.series.items()):
+            names, total = self.labels + ("le",), 0
+            for bound, n in zip(self.buckets, s):
+                total += n
+                out.append(f"{self.name}_bucket{_labels(names, key + (bound,))} {total}")
+            out.append(f"{self.name}_bucket{_labels(names, key + ('+Inf',))} {s[-1]}")
+            out.append(f"{self.name}_sum{_labels(self.labels, key)} {s[-2]:.6f}")
+            out.append(f"{self.name}_count{_labels(self.labels, key)} {s[-1]}")
+        return out
+
+
+REGISTRY = []
+
+def _register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+stage_seconds = _register(Histogram(
+    "resume_stage_seconds", "Time spent per pipeline stage.", ("stage",)))
+request_seconds = _register(Histogram(
+    "resume_request_seconds", "Request latency by endpoint and status.",
+    ("endpoint", "status")))
+llm_tokens = _register(Counter(
+    "resume_llm_tokens_total", "LLM tokens used.", ("model", "kind")))
+llm_cost = _register(Counter(
+    "resume_llm_cost_usd_total", "Estimated LLM spend in US dollars.", ("model",)))
+rate_limited = _register(Counter(
+    "resume_rate_limited_total", "Requests refused by admission control.", ("reason",)))
+
+
+@contextmanager
+def span(stage):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        stage_seconds.observe(dt, stage)
+        if has_request_context():
+            g.setdefault("timings", []).append((stage, dt))
+
+
+def record_usage(model, prompt_tokens, completion_tokens, price_in, price_out):
+    """Count tokens and their cost (prices are USD per million tokens)."""
+    llm_tokens.inc(prompt_tokens, model, "prompt")
+    llm_tokens.inc(completion_tokens, model, "completion")
+    llm_cost.inc((prompt_tokens * price_in + completion_tokens * price_out) / 1e6, model)
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+def install(app):
+    @app.before_request
+    def _start():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _finish(resp):
+        started = g.get("request_started")
+        if started is None:
+            return resp
+        total = time.perf_counter() - started
+        request_seconds.observe(total, request.endpoint or "unknown", resp.status_code)
+        # Streamed bodies run after this hook, so their stages show up in
+        # the histograms only.
+        parts = [f"{stage};dur={dt*1000:.1f}" for stage, dt in g.get("timings", [])]
+        parts.append(f"total;dur={total*1000:.1f}")
+        resp.headers["Server-Timing"] = ", ".join(parts)
+        return resp
@@ -0,0 +1,347 @@
+"""fpdf2 rendering of resumes and cover letters.
+
+Kept free of Flask and Groq imports so PDF worker processes can load it
+cheaply.
+"""
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+import os, io, re, json
+from functools import lru_cache
+
+import pdf_fonts, pdf_templates
+from pdf_templates import CLEAN_CHARS
+from resume_parser import parse_output, parse_structured
+
+# auto: embed the Unicode TTF only for documents latin-1 can't represent
+# always / never: force one or the other
+PDF_UNICODE = os.getenv("PDF_UNICODE", "auto").lower()
+
+# CLEAN_CHARS (pdf_templates) maps typographic characters the core
+# Helvetica font can't show to ASCII; anything else outside latin-1 becomes "?".
+NON_LATIN1 = re.compile(r"[^\x00-\xff]")
+
+def clean(text):
+    # Most fields are plain ASCII and come back untouched.
+    if text.isascii():
+        return text
+    return _clean_unicode(text)
+
+@lru_cache(maxsize=2048)
+def _clean_unicode(text):
+    return NON_LATIN1.sub("?", text.translate(CLEAN_CHARS))
+
+def beyond_latin1(text):
+    """Characters of ``text`` the core fonts can't show, even after clean()."""
+    if text.isascii():
+        return set()
+    return set(NON_LATIN1.findall(text.translate(CLEAN_CHARS)))
+
+def new_pdf(text):
+    """Blank FPDF for a document containing ``text``.
+
+    Returns (pdf, font family, sanitizer): the cached Unicode TTF with text
+    as-is when latin-1 is not enough and the TTF (plus fallbacks) has a
+    glyph for every such character, otherwise core Helvetica with clean().
+    A font without the glyphs would draw blanks, which is worse than "?"."""
+    pdf = FPDF()
+    if PDF_UNICODE != "never" and pdf_fonts.available():
+        if PDF_UNICODE == "always":
+            return pdf, pdf_fonts.install(pdf), str
+        chars = beyond_latin1(text)
+        if chars and pdf_fonts.covers(chars):
+            return pdf, pdf_fonts.install(pdf), str
+    return pdf, "Helvetica", clean
+
+# ─────────────────────────────────────────────────────────────
+#  DRAWING STATE — skip set_* calls that would change nothing
+# ─────────────────────────────────────────────────────────────
+class Pen:
+    __slots__ = ("pdf", "family", "font", "text", "fill", "draw")
+
+    def __init__(self, pdf, family):
+        self.pdf, self.family = pdf, family
+        self.font = self.text = self.fill = self.draw = None
+
+    def use(self, st):
+        """Font and text colour of ``Style`` st."""
+        font = (st.style, st.size)
+        if font != self.font:
+            self.pdf.set_font(self.family, st.style, st.size)
+            self.font = font
+        if st.color != self.text:
+            self.pdf.set_text_color(*st.color)
+            self.text = st.color
+
+    def fill_color(self, rgb):
+        if rgb != self.fill:
+            self.pdf.set_fill_color(*rgb)
+            self.fill = rgb
+
+    def draw_color(self, rgb):
+        if rgb != self.draw:
+            self.pdf.set_draw_color(*rgb)
+            self.draw = rgb
+
+
+# ─────────────────────────────────────────────────────────────
+#  RESUME PDF — walks a compiled plan from pdf_templates
+# ─────────────────────────────────────────────────────────────
+NL    = dict(new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+RIGHT = dict(new_x=XPos.RIGHT, new_y=YPos.TOP)
+WHITE = (255, 255, 255)
+
+def _header(pdf, pen, p, S, tx, data):
+    pen.fill_color(WHITE)
+    pdf.rect(0, 0, p.W, p.header_h, "F")
+
+    name = tx(data.get("name","Your Name"))
+    contact = [tx(data[k]) for k in ("phone","email","linkedin","location") if data.get(k)]
+    if p.header == "split":
+        # Name left, contact block right
+        pdf.set_xy(p.M, 9)
+        pen.use(S["name"])
+        pdf.cell(105, S["name"].h, name)
+        pen.use(S["contact"])
+        cy = 8
+        for c in contact:
+            pdf.set_xy(p.M+105, cy)
+            pdf.cell(p.CW-105, S["contact"].h, c, align="R", **NL)
+            cy += S["contact"].h + 0.5
+    else:
+        align = "C" if p.header == "center" else "L"
+        pdf.set_xy(p.M, 8)
+        pen.use(S["name"])
+        pdf.cell(p.CW, S["name"].h, name, align=align, **NL)
+        if contact:
+            pdf.set_x(p.M)
+            pen.use(S["contact"])
+            pdf.multi_cell(p.CW, S["contact"].h, p.contact_sep.join(contact), align=align)
+
+    # Divider
+    pdf.set_y(p.header_h)
+    if p.header_rule:
+        pen.draw_color(p.header_rule[0])
+        pdf.set_line_width(p.header_rule[1])
+        pdf.line(p.M, p.header_h, p.right, p.header_h)
+        pdf.set_line_width(0.2)
+    pdf.ln(3)
+
+def _section_title(pdf, pen, p, S, txt):
+    pdf.set_x(p.M)
+    pen.use(S["section"])
+    pdf.cell(p.CW, S["section"].h, txt, **NL)
+    if p.section_rule:
+        pen.draw_color(p.section_rule)
+        pdf.line(p.M, pdf.get_y(), p.right, pdf.get_y())
+        pdf.ln(2.5)
+    else:
+        pdf.ln(1.5)
+
+def _bullet(pdf, pen, p, S, txt):
+    body = S["body"]
+    pdf.set_x(p.M+3)
+    pen.use(body)
+    pdf.cell(5, body.h, "-", **RIGHT)
+    pdf.set_x(p.M+9)
+    pdf.multi_cell(p.CW-9, body.h, txt)
+
+def _paragraph(pdf, pen, p, st, txt):
+    pdf.set_x(p.M)
+    pen.use(st)
+    pdf.multi_cell(p.CW, st.h, txt)
+
+def _tags(pdf, pen, p, S, items):
+    """Draw items as bordered tag boxes, wrapping to next line."""
+    tag = S["tag"]
+    x = p.M
+    y = pdf.get_y()
+    pen.use(tag)
+    for item in items:
+        if not item: continue
+        tw = pdf.get_string_width(item) + 8
+        if x + tw > p.right:
+            x  = p.M
+            y += 6.5
+        pen.fill_color(p.tag_fill)
+        pen.draw_color(p.tag_draw)
+        pdf.rect(x, y, tw, 5.8, "FD")
+        pdf.set_xy(x+1, y+0.8)
+        pdf.cell(tw-2, tag.h, item)
+        x += tw + 3
+    pdf.set_y(y + 6.5)
+
+def _summary(pdf, pen, p, S, tx, data, title):
+    summary = tx(data.get("summary","").strip())
+    if summary:
+        _section_title(pdf, pen, p, S, title)
+        _paragraph(pdf, pen, p, S["body"], summary)
+        pdf.ln(2)
+
+def _skills(pdf, pen, p, S, tx, data, title):
+    skills = [tx(s.strip()) for s in data.get("skills",[]) if s.strip()]
+    if skills:
+        _section_title(pdf, pen, p, S, title)
+        if p.skills == "tags":
+            _tags(pdf, pen, p, S, skills)
+        else:
+            _paragraph(pdf, pen, p, S["body"], ", ".join(skills))
+        pdf.ln(1)
+
+def _entry_head(pdf, pen, p, S, kind, title, loc):
+    # Title bold left, location italic right
+    pdf.set_x(p.M)
+    pen.use(S[kind+"_title"])
+    pdf.cell(p.CW-45, S[kind+"_title"].h, title, **RIGHT)
+    pen.use(S[kind+"_loc"])
+    pdf.cell(45, S[kind+"_loc"].h, loc, align="R", **NL)
+
+def _line(pdf, pen, p, st, txt):
+    pdf.set_x(p.M)
+    pen.use(st)
+    pdf.cell(p.CW, st.h, txt, **NL)
+
+def _education(pdf, pen, p, S, tx, data, title):
+    education = data.get("education",[])
+    if not education: return
+    _section_title(pdf, pen, p, S, title)
+    for edu in education:
+        _entry_head(pdf, pen, p, S, "edu", tx(edu.get("institution","")),
+                    tx(edu.get("location","")))
+        deg = tx(edu.get("degree",""))
+        if deg:
+            _line(pdf, pen, p, S["edu_degree"], deg)
+        # Year + Grade
+        sub = "  |  ".join(filter(None,[tx(edu.get("year","")), tx(edu.get("grade",""))]))
+        if sub:
+            _line(pdf, pen, p, S["edu_meta"], sub)
+        pdf.ln(2)
+
+def _experience(pdf, pen, p, S, tx, data, title):
+    experience = data.get("experience",[])
+    if not experience: return
+    _section_title(pdf, pen, p, S, title)
+    for exp in experience:
+        start = tx(exp.get("start",""))
+        end   = tx(exp.get("end",""))
+        dates = (start + (" - " + end if end else "")).strip()
+        _entry_head(pdf, pen, p, S, "exp", tx(exp.get("company","")),
+                    tx(exp.get("location","")))
+        role = tx(exp.get("role",""))
+        if role:
+            _line(pdf, pen, p, S["exp_role"], role)
+        if dates:
+            _line(pdf, pen, p, S["exp_dates"], dates)
+        for b in exp.get("bullets",[]):
+            _bullet(pdf, pen, p, S, tx(b))
+        pdf.ln(2)
+
+def _projects(pdf, pen, p, S, tx, data, title):
+    projects = data.get("projects",[])
+    if not projects: return
+    _section_title(pdf, pen, p, S, title)
+    for proj in projects:
+        pname = tx(proj.get("name",""))
+        tech  = tx(proj.get("tech",""))
+        _paragraph(pdf, pen, p, S["project"], pname + (" | " + tech if tech else ""))
+        for b in proj.get("bullets",[]):
+            _bullet(pdf, pen, p, S, tx(b))
+        pdf.ln(2)
+
+def _certifications(pdf, pen, p, S, tx, data, title):
+    certs = data.get("certifications",[])
+    if not certs: return
+    _section_title(pdf, pen, p, S, title)
+    for c in certs:
+        _bullet(pdf, pen, p, S, tx(c))
+    pdf.ln(2)
+
+def _languages(pdf, pen, p, S, tx, data, title):
+    langs = [tx(l.strip()) for l in data.get("languages",[]) if l.strip()]
+    if not langs: return
+    _section_title(pdf, pen, p, S, title)
+    _paragraph(pdf, pen, p, S["body"], ",  ".join(langs))
+    pdf.ln(1)
+
+SECTION_RENDERERS = {
+    "summary": _summary, "skills": _skills, "education": _education,
+    "experience": _experience, "projects": _projects,
+    "certifications": _certifications, "languages": _languages,
+}
+# Section walks bound to their renderers once, keyed by plan.sections
+STEPS = {}
+
+def _steps(plan):
+    steps = STEPS.get(plan.sections)
+    if steps is None:
+        steps = STEPS[plan.sections] = [(SECTION_RENDERERS[k], t) for k, t in plan.sections]
+    return steps
+
+def build_resume_pdf(data, template=None):
+    plan = pdf_templates.get(template)
+    pdf, F, tx = new_pdf(json.dumps(data, ensure_ascii=False))
+    pdf.set_margins(0, 0, 0)
+    pdf.set_auto_page_break(auto=True, margin=plan.bottom_margin)
+    pdf.add_page()
+    # Templates pick between the core families; Unicode documents keep the TTF.
+    pen = Pen(pdf, plan.family if F == "Helvetica" else F)
+    S = plan.styles
+
+    _header(pdf, pen, plan, S, tx, data)
+    for render, title in _steps(plan):
+        render(pdf, pen, plan, S, tx, data, title)
+
+    buf = io.BytesIO(pdf.output())
+    buf.seek(0)
+    return buf
+
+
+# ─────────────────────────────────────────────────────────────
+#  COVER LETTER PDF
+# ─────────────────────────────────────────────────────────────
+def build_cover_pdf(name, job_title, content):
+    pdf, F, tx = new_pdf(name + job_title + content)
+    pdf.set_margins(20,20,20)
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.add_page()
+    W=210; M=20; CW=W-2*M
+
+    pdf.set_fill_color(26,71,42)
+    pdf.rect(0,0,W,40,"F")
+    pdf.set_xy(0,9)
+    pdf.set_font(F,"B",18)
+    pdf.set_text_color(255,255,255)
+    pdf.cell(W,11,tx(name.upper()),
+             new_x=XPos.LMARGIN,new_y=YPos.NEXT,align="C")
+    pdf.set_font(F,"",9)
+    pdf.set_text_color(190,230,190)
+    pdf.cell(W,7,tx(f"Cover Letter - {job_title}"),
+             new_x=XPos.LMARGIN,new_y=YPos.NEXT,align="C")
+    pdf.ln(14)
+
+    pen, body = Pen(pdf, F), pdf_templates.Style("", 10, (50,50,50), 6)
+    for raw in content.split("\n"):
+        s = tx(re.sub(r'\*\*(.+?)\*\*',r'\1',raw.strip()))
+        if not s:
+            pdf.ln(3); continue
+        pdf.set_x(M)
+        pen.use(body)
+        pdf.multi_cell(CW,body.h,s)
+
+    buf = io.BytesIO(pdf.output())
+    buf.seek(0)
+    return buf
+
+
+# ─────────────────────────────────────────────────────────────
+#  OUTPUT TEXT → PDF BYTES
+# ─────────────────────────────────────────────────────────────
+def render_resume(output, raw, template=None):
+    resume_text,_ = parse_output(output)
+    return render_resume_data(parse_structured(resume_text, raw), template)
+
+def render_resume_data(structured, template=None):
+    return build_resume_pdf(structured, template).getvalue()
+
+def render_cover(output, name, job_title):
+    _,cover_text = parse_output(output)
+    return build_cover_pdf(name, job_title, cover_text).getvalue()
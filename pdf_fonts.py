@@ -0,0 +1,139 @@
+"""Unicode TrueType fonts for the PDF builders, parsed once per process.
+
+Core Helvetica only covers latin-1, so names and languages in Tamil, Urdu,
+Arabic etc. used to come out as "?". When a document needs more than
+latin-1, pdf_builder switches to an embedded TTF family instead; fpdf2
+subsets it on output, so only the glyphs actually drawn are embedded.
+
+Font files are looked up in PDF_FONT_DIR, then ``fonts/`` next to this file
+(bundled, so serverless deploys have them), then the system DejaVu location:
+
+    DejaVuSans.ttf  DejaVuSans-Bold.ttf  DejaVuSans-Oblique.ttf
+    NotoSerifTamil-Regular.otf  NotoNaskhArabic-Regular.otf
+
+DejaVu has no Tamil (or other Indic) glyphs and only part of Arabic, so the
+two Noto faces are registered as fallbacks for the scripts it lacks
+(DejaVu: Bitstream Vera license; Noto: SIL OFL 1.1, see ``fonts/``).
+PDF_FALLBACK_FONTS adds more font paths, comma separated, e.g.
+
+    PDF_FALLBACK_FONTS=/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf
+
+Joined scripts (Tamil vowel signs, Arabic letter forms) need text shaping,
+which fpdf2 does through uharfbuzz; it is switched on whenever uharfbuzz is
+importable.
+
+A document is only drawn with these fonts when they have a glyph for every
+character latin-1 can't show (``covers``); otherwise it keeps core
+Helvetica, where such characters print as "?" rather than as blanks.
+
+Parsing a TTF (fontTools load + per-glyph width table) takes hundreds of
+milliseconds for a full-coverage font, so each file is parsed once into a
+template ``TTFFont``. Every document gets a cheap copy that shares the
+read-only metrics and opens its own lazy ``TTFont`` handle, since fpdf2
+subsets that handle in place when the document is written. That copy leans
+on fpdf2's ``TTFFont`` internals, hence the exact fpdf2 pin in
+requirements.txt; bump it only together with ``add_font``.
+"""
+import os, copy, threading
+from fpdf import FPDF
+from fpdf.fonts import SubsetMap
+from fontTools import ttLib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FONT_DIRS = [d for d in (os.getenv("PDF_FONT_DIR"), os.path.join(HERE, "fonts"),
+                         "/usr/share/fonts/truetype/dejavu") if d]
+FAMILY = "UniSans"
+STYLE_FILES = {"": "DejaVuSans.ttf", "B": "DejaVuSans-Bold.ttf",
+               "I": "DejaVuSans-Oblique.ttf"}
+FALLBACK_FILES = ("NotoSerifTamil-Regular.otf", "NotoNaskhArabic-Regular.otf")
+
+_templates = {}          # (path, style) -> parsed TTFFont
+_lock = threading.Lock()
+
+
+def _find(fname):
+    for d in FONT_DIRS:
+        path = os.path.join(d, fname)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def font_files():
+    """Map style -> TTF path, or None if the regular face is missing."""
+    files = {style: _find(f) for style, f in STYLE_FILES.items()}
+    if not files[""]:
+        return None
+    # Missing bold/italic faces fall back to the regular one.
+    return {style: path or files[""] for style, path in files.items()}
+
+
+def fallback_files():
+    paths = [p.strip() for p in os.getenv("PDF_FALLBACK_FONTS", "").split(",")]
+    paths += [_find(f) for f in FALLBACK_FILES]
+    return [p for p in paths if p and os.path.exists(p)]
+
+
+def shaping():
+    try:
+        import uharfbuzz  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available():
+    return font_files() is not None
+
+
+_coverage = None
+
+def covers(chars):
+    """True if the regular face or a fallback has a glyph for every char."""
+    global _coverage
+    if _coverage is None:
+        cmap = set(_template(font_files()[""], FAMILY, "").cmap)
+        for n, path in enumerate(fallback_files()):
+            cmap.update(_template(path, f"UniFallback{n}", "").cmap)
+        _coverage = frozenset(cmap)
+    return all(ord(c) in _coverage for c in chars)
+
+
+def _template(path, family, style):
+    key = (path, family, style)
+    with _lock:
+        font = _templates.get(key)
+        if font is None:
+            scratch = FPDF()
+            scratch.add_font(family, style, path)
+            font = _templates[key] = scratch.fonts[f"{family.lower()}{style}"]
+        return font
+
+
+def add_font(pdf, family, style, path):
+    """``pdf.add_font(family, style, path)`` backed by the process cache."""
+    tpl  = _template(path, family, style)
+    font = copy.copy(tpl)
+    font.i = len(pdf.fonts) + 1
+    font.ttfont = ttLib.TTFont(path, recalcTimestamp=False, lazy=True)
+    font.missing_glyphs  = []
+    font.biggest_size_pt = 0
+    font._hbfont = None
+    font.subset  = SubsetMap(font)
+    pdf.fonts[tpl.fontkey] = font
+
+
+def install(pdf):
+    """Register the Unicode family (and fallbacks) on ``pdf``; returns its name."""
+    for style, path in font_files().items():
+        add_font(pdf, FAMILY, style, path)
+    fallbacks = []
+    for n, path in enumerate(fallback_files()):
+        name = f"UniFallback{n}"
+        add_font(pdf, name, "", path)
+        fallbacks.append(name)
+    if fallbacks:
+        pdf.set_fallback_fonts(fallbacks, exact_match=False)
+    if shaping():
+        pdf.set_text_shaping(True)
+    return FAMILY
@@ -0,0 +1,138 @@
+"""Process pool for CPU-bound PDF rendering.
+
+fpdf2 layout is pure Python and holds the GIL, so rendering on the request
+thread stalls every other request in the worker. ``PDFRenderPool`` farms it
+out to pre-warmed processes instead:
+
+  render(fn, *args)   run ``fn(*args)`` in a worker and return its result
+  submit(fn, *args)   same, but return a ``concurrent.futures.Future``
+
+``fn`` must be a module-level function (``pdf_builder.render_resume`` etc.)
+or its ``"module:function"`` name, which is resolved in the worker, so the
+caller never has to import fpdf2 itself.
+Workers are forked from a forkserver that has already imported fpdf2, and
+each one renders a throwaway page on start-up, so the first real request
+does not pay for imports or font setup.
+
+At most ``max_pending`` renders may be queued or running; beyond that
+``submit`` raises ``PoolBusy`` (or waits, with ``block=True``). ``render``
+raises ``concurrent.futures.TimeoutError`` after ``timeout`` seconds.
+
+A worker that dies (OOM kill, segfault) breaks the whole
+``ProcessPoolExecutor``; the pool is then shut down and rebuilt on the next
+submit, and ``render`` retries once.
+
+With ``workers=0`` everything runs inline on the calling thread, and so it
+does if the pool cannot start (no POSIX semaphores on AWS Lambda).
+"""
+import threading, importlib, logging
+from concurrent.futures import Future, BrokenExecutor
+
+log = logging.getLogger(__name__)
+
+
+class PoolBusy(Exception):
+    """Raised when the render queue is full."""
+
+
+def _warm():
+    from pdf_builder import build_cover_pdf
+    build_cover_pdf("Warm Up", "Worker", "Ready.")
+
+
+def _noop():
+    return None
+
+
+def _call(target, *args):
+    module, name = target.split(":")
+    return getattr(importlib.import_module(module), name)(*args)
+
+
+class PDFRenderPool:
+    def __init__(self, workers=2, max_pending=64, timeout=30):
+        self.workers, self.timeout = workers, timeout
+        self.slots    = threading.BoundedSemaphore(max_pending)
+        self.executor = None
+        self.mutex    = threading.Lock()
+
+    def _start(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        methods = multiprocessing.get_all_start_methods()
+        if "forkserver" in methods:
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(["pdf_builder", "exporters"])
+        else:
+            ctx = multiprocessing.get_context("spawn")
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=ctx,
+                                            initializer=_warm)
+        # Bring every worker up now rather than on the first real render.
+        for f in [self.executor.submit(_noop) for _ in range(self.workers)]:
+            f.result()
+
+    def start(self):
+        with self.mutex:
+            if self.workers and self.executor is None:
+                try:
+                    self._start()
+                except Exception:
+                    log.warning("PDF worker pool unavailable, rendering inline",
+                                exc_info=True)
+                    self.shutdown()
+                    self.workers = 0
+
+    def restart(self, broken):
+        """Drop ``broken`` (a pool that lost a worker); the next submit
+        starts a fresh one. Other callers that saw the same pool break
+        find it already replaced."""
+        with self.mutex:
+            if self.executor is broken:
+                log.warning("PDF worker died, restarting the pool")
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+    def _dispatch(self, fn, args):
+        self.start()
+        executor = self.executor
+        if executor is None:
+            fut = Future()
+            try:
+                fut.set_result(fn(*args))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+        try:
+            return executor.submit(fn, *args)
+        except BrokenExecutor:
+            self.restart(executor)
+            raise
+
+    def submit(self, fn, *args, block=False):
+        if not self.slots.acquire(blocking=block):
+            raise PoolBusy("PDF render queue is full")
+        if isinstance(fn, str):
+            fn, args = _call, (fn,) + args
+        try:
+            try:
+                fut = self._dispatch(fn, args)
+            except BrokenExecutor:
+                fut = self._dispatch(fn, args)
+        except BaseException:
+            self.slots.release()
+            raise
+        fut.add_done_callback(lambda _: self.slots.release())
+        return fut
+
+    def render(self, fn, *args, timeout=None):
+        timeout = timeout or self.timeout
+        try:
+            return self.submit(fn, *args).result(timeout=timeout)
+        except BrokenExecutor:
+            # Its worker died mid-render; the retry lands on a fresh pool.
+            return self.submit(fn, *args).result(timeout=timeout)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
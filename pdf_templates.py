@@ -0,0 +1,179 @@
+"""Resume PDF templates: declarative specs compiled once into render plans.
+
+A spec says how a template looks (fonts, sizes, colours, line heights,
+rules) and how it is laid out (header style, section order and titles,
+how skills are shown). ``register`` resolves a spec against its ``base``,
+checks it and compiles it into a ``Plan``: immutable ``Style`` tuples and
+precomputed geometry that ``pdf_builder`` walks without any lookups or
+string handling per element. Plans are built at import, so the number of
+templates has no effect on render time.
+
+    register("compact", {"base": "modern", "margin": 9,
+                         "styles": {"body": ("", 8.5, (40, 40, 40), 4.5)}})
+
+Style tuples are ``(font style, size pt, (r, g, b), line height mm)``.
+"""
+from collections import namedtuple
+
+# Bump when the rendered output changes, so cached PDFs are not reused.
+# Lives here rather than in pdf_builder so cache keys need no fpdf2 import.
+LAYOUT_VERSION = 5
+
+# Typographic characters mapped to ASCII lookalikes, for the core PDF fonts
+# and plain-text exports. Lives here so exporters need no fpdf2 import.
+CLEAN_CHARS = str.maketrans({
+    "\u2018":"'","\u2019":"'","\u201c":'"',"\u201d":'"',
+    "\u2013":"-","\u2014":"-","\u2022":"-","\u2026":"...",
+    "\u00a0":" ","\u00b7":"-","\u2015":"-","\u2012":"-",
+})
+
+Style = namedtuple("Style", "style size color h")
+
+SECTION_KEYS = ("summary", "skills", "education", "experience", "projects",
+                "certifications", "languages")
+FAMILIES     = {"sans": "Helvetica", "serif": "Times"}
+HEADERS      = ("split", "center", "left")
+SKILL_MODES  = ("tags", "inline")
+
+TEMPLATES = {
+    # The original single layout.
+    "modern": {
+        "font": "sans", "page_w": 210, "margin": 12, "bottom_margin": 10,
+        "header": "split", "header_h": 34, "header_rule": ((20, 20, 20), 0.7),
+        "contact_sep": None,
+        "section_rule": (160, 160, 160), "section_upper": False,
+        "skills": "tags", "tag_fill": (242, 242, 242), "tag_draw": (190, 190, 190),
+        "sections": [("summary", "Summary"), ("skills", "Skills"),
+                     ("education", "Education"), ("experience", "Experience"),
+                     ("projects", "Projects"), ("certifications", "Certifications"),
+                     ("languages", "Language")],
+        "styles": {
+            "name":       ("B", 20,   (15, 15, 15),    10),
+            "contact":    ("",  8,    (60, 60, 60),    5),
+            "section":    ("B", 10.5, (15, 15, 15),    5.5),
+            "body":       ("",  9,    (50, 50, 50),    5),
+            "tag":        ("",  8.5,  (35, 35, 35),    4.2),
+            "edu_title":  ("B", 10,   (15, 15, 15),    5.5),
+            "edu_loc":    ("I", 8.5,  (110, 110, 110), 5.5),
+            "edu_degree": ("B", 9,    (40, 40, 40),    5),
+            "edu_meta":   ("",  8.5,  (110, 110, 110), 4.5),
+            "exp_title":  ("B", 10,   (15, 15, 15),    5),
+            "exp_loc":    ("I", 8,    (110, 110, 110), 5),
+            "exp_role":   ("B", 9,    (40, 40, 40),    4.5),
+            "exp_dates":  ("",  8,    (110, 110, 110), 4),
+            "project":    ("B", 9.5,  (20, 20, 20),    5.5),
+        },
+    },
+    # Serif, centred header, experience first, skills as one line.
+    "classic": {
+        "base": "modern", "font": "serif", "margin": 16,
+        "header": "center", "header_h": 30, "header_rule": ((0, 0, 0), 0.4),
+        "contact_sep": "  |  ",
+        "section_rule": (0, 0, 0), "section_upper": True, "skills": "inline",
+        "sections": [("summary", "Professional Summary"), ("experience", "Experience"),
+                     ("education", "Education"), ("skills", "Skills"),
+                     ("projects", "Projects"), ("certifications", "Certifications"),
+                     ("languages", "Languages")],
+        "styles": {
+            "name":      ("B", 22,   (0, 0, 0),       10),
+            "contact":   ("",  9,    (40, 40, 40),    5),
+            "section":   ("B", 11,   (0, 0, 0),       6),
+            "body":      ("",  10,   (30, 30, 30),    5),
+            "edu_title": ("B", 10.5, (0, 0, 0),       5.5),
+            "exp_title": ("B", 10.5, (0, 0, 0),       5.5),
+            "edu_loc":   ("I", 9,    (80, 80, 80),    5.5),
+            "exp_loc":   ("I", 9,    (80, 80, 80),    5.5),
+            "edu_degree": ("I", 10,  (30, 30, 30),    5),
+            "exp_role":  ("I", 10,   (30, 30, 30),    5),
+            "edu_meta":  ("",  9,    (80, 80, 80),    4.5),
+            "exp_dates": ("",  9,    (80, 80, 80),    4.5),
+            "project":   ("B", 10,   (0, 0, 0),       5.5),
+        },
+    },
+    # Left-aligned, no rules, muted section labels.
+    "minimal": {
+        "base": "modern", "margin": 18, "header": "left", "header_h": 26,
+        "header_rule": None, "contact_sep": "  /  ",
+        "section_rule": None, "section_upper": True, "skills": "inline",
+        "sections": [("summary", "Profile"), ("experience", "Experience"),
+                     ("education", "Education"), ("skills", "Skills"),
+                     ("projects", "Projects"), ("certifications", "Certifications"),
+                     ("languages", "Languages")],
+        "styles": {
+            "name":    ("B", 18, (20, 20, 20),    9),
+            "contact": ("",  8,  (100, 100, 100), 4.5),
+            "section": ("B", 8,  (120, 120, 120), 5),
+            "body":    ("",  9,  (45, 45, 45),    4.8),
+        },
+    },
+}
+
+DEFAULT = "modern"
+
+
+class Plan(namedtuple("Plan", "name family W M CW right bottom_margin header header_h "
+                              "header_rule contact_sep section_rule skills tag_fill "
+                              "tag_draw sections styles")):
+    """Compiled template. ``styles`` maps role -> ``Style``; ``sections``
+    is the ordered ((key, title), ...) to draw."""
+    __slots__ = ()
+
+
+def _resolve(name, seen=()):
+    spec = TEMPLATES[name]
+    if "base" not in spec:
+        return dict(spec, styles=dict(spec["styles"]))
+    if spec["base"] in seen + (name,):
+        raise ValueError(f"Template {name!r} inherits from itself")
+    merged = _resolve(spec["base"], seen + (name,))
+    styles = dict(merged["styles"], **spec.get("styles", {}))
+    merged.update({k: v for k, v in spec.items() if k != "base"}, styles=styles)
+    return merged
+
+
+def compile_template(name):
+    spec = _resolve(name)
+    if spec["font"] not in FAMILIES:
+        raise ValueError(f"{name}: font must be one of {sorted(FAMILIES)}")
+    if spec["header"] not in HEADERS or spec["skills"] not in SKILL_MODES:
+        raise ValueError(f"{name}: bad header or skills mode")
+    for key, _ in spec["sections"]:
+        if key not in SECTION_KEYS:
+            raise ValueError(f"{name}: unknown section {key!r}")
+    styles = {role: Style(s[0], s[1], tuple(s[2]), s[3])
+              for role, s in spec["styles"].items()}
+    missing = set(TEMPLATES[DEFAULT]["styles"]) - set(styles)
+    if missing:
+        raise ValueError(f"{name}: missing styles {sorted(missing)}")
+    upper = spec["section_upper"]
+    W, M = spec["page_w"], spec["margin"]
+    return Plan(
+        name=name, family=FAMILIES[spec["font"]], W=W, M=M, CW=W - 2*M, right=W - M,
+        bottom_margin=spec["bottom_margin"], header=spec["header"],
+        header_h=spec["header_h"], header_rule=spec["header_rule"],
+        contact_sep=spec["contact_sep"], section_rule=spec["section_rule"],
+        skills=spec["skills"], tag_fill=spec["tag_fill"], tag_draw=spec["tag_draw"],
+        sections=tuple((k, t.upper() if upper else t) for k, t in spec["sections"]),
+        styles=styles)
+
+
+PLANS = {}
+
+def register(name, spec):
+    """Add (or replace) template ``name`` and compile it."""
+    TEMPLATES[name] = spec
+    PLANS[name] = compile_template(name)
+    return PLANS[name]
+
+
+def get(name):
+    """Plan for ``name``; unknown or empty names get the default template."""
+    return PLANS.get(name) or PLANS[DEFAULT]
+
+
+def names():
+    return sorted(PLANS)
+
+
+for _name in list(TEMPLATES):
+    PLANS[_name] = compile_template(_name)
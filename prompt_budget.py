@@ -0,0 +1,132 @@
+"""Token budgeting for the generation prompt.
+
+Nothing here calls a tokenizer: ``estimate_tokens`` is a local heuristic
+(about four characters or 0.75 words per token for English, whichever is
+larger) that is close enough to size a request.
+
+``plan()`` runs between building the prompt and calling the model:
+
+  * if the prompt would exceed PROMPT_TOKEN_BUDGET input tokens, the job
+    description is deduplicated and cut down to its requirement / skill
+    lines (``compress_job_desc``), also where it is pasted into a client
+    supplied ``full_prompt``;
+  * ``max_tokens`` is sized to the sections the candidate actually has
+    rather than a flat LLM_MAX_TOKENS, with OUTPUT_MARGIN to spare. A reply
+    that still hits the limit is the caller's to catch (finish_reason
+    "length"); it raises ``OutputTruncated`` rather than keep a cut-off
+    cover letter.
+"""
+import os, re
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 2500))
+JOB_DESC_MIN_TOKENS = int(os.getenv("JOB_DESC_MIN_TOKENS", 250))
+MIN_OUTPUT_TOKENS   = int(os.getenv("LLM_MIN_TOKENS", 1000))
+# Headroom over the OUTPUT_COST estimate; long names and wordy jobs run over.
+OUTPUT_MARGIN       = float(os.getenv("LLM_OUTPUT_MARGIN", 1.3))
+
+# Rough completion cost of each part of the answer, in tokens.
+OUTPUT_COST = {
+    "markers": 20, "summary": 150, "skills": 60, "cover_letter": 520,
+    "experience": 160,      # per job
+    "education": 35,        # per qualification
+    "projects": 140, "certifications": 40, "languages": 30,
+}
+JSON_OVERHEAD = 1.15        # keys and quoting in JSON mode
+
+KEYWORDS = re.compile(
+    r"\b(require|must|should|experience|years?|skill|proficien|knowledge|"
+    r"familiar|responsib|qualif|degree|expert|ability|strong|stack|"
+    r"nice to have|preferred|plus)", re.I)
+SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+BULLET = re.compile(r"^\s*(?:[-*•·]|\d+[.)])\s*")
+
+
+class OutputTruncated(Exception):
+    """The model stopped at max_tokens even at the ceiling."""
+
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    return max(len(text) // 4, int(len(text.split()) / 0.75))
+
+
+def _norm(s):
+    return re.sub(r"\W+", " ", s).strip().lower()
+
+
+def compress_job_desc(text, max_tokens):
+    """Dedupe ``text`` and keep its most requirement-like lines, in order,
+    within ``max_tokens``."""
+    pieces, seen = [], set()
+    for p in SPLIT.split(text):
+        p = p.strip()
+        key = _norm(p)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        pieces.append(p)
+    if estimate_tokens("\n".join(pieces)) <= max_tokens:
+        return "\n".join(pieces)
+
+    # Score: keyword hits, bullets (requirement lists), then earlier first.
+    scored = sorted(range(len(pieces)), key=lambda i: (
+        -(len(KEYWORDS.findall(pieces[i])) + bool(BULLET.match(pieces[i]))), i))
+    keep, used = set(), 0
+    for i in scored:
+        cost = estimate_tokens(pieces[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        keep.add(i); used += cost
+    if not keep:
+        # One unbroken block (a pasted skills list): cut the best piece to fit.
+        return _truncate(pieces[scored[0]], max_tokens)
+    return "\n".join(pieces[i] for i in sorted(keep))
+
+
+def _truncate(text, max_tokens):
+    """Leading words of ``text`` within ``max_tokens``."""
+    cut = " ".join(text.split()[:int(max_tokens * 0.75)])
+    if len(cut) > max_tokens * 4:
+        cut = cut[:max_tokens * 4].rsplit(" ", 1)[0]
+    return cut
+
+
+def requested_sections(data, prompt):
+    """Sections the answer will contain, with a count for repeated ones."""
+    sections = {"markers": 1, "summary": 1, "skills": 1, "cover_letter": 1,
+                "languages": 1,
+                "experience": max(len(data.get("experience_entries") or []), 1),
+                "education":  max(len(data.get("education_entries") or []), 1)}
+    for name, header in (("projects", "PROJECTS:"), ("certifications", "CERTIFICATIONS:")):
+        if data.get(name) or header in prompt:
+            sections[name] = 1
+    for name in data.get("sections") or ():
+        sections.setdefault(name, 1)
+    return sections
+
+
+def output_tokens(sections, as_json=False, ceiling=2000):
+    want = sum(OUTPUT_COST.get(name, 60) * n for name, n in sections.items())
+    if as_json:
+        want *= JSON_OVERHEAD
+    return max(MIN_OUTPUT_TOKENS, min(int(want * OUTPUT_MARGIN), ceiling))
+
+
+def plan(data, prompt, system_prompt, as_json=False, ceiling=2000):
+    """Return ``(prompt, max_tokens, stats)`` for one request."""
+    job_desc = (data.get("job_desc") or "").strip()
+    jd_tokens = estimate_tokens(job_desc)
+    total = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+    stats = {"system_tokens": estimate_tokens(system_prompt),
+             "job_desc_tokens": jd_tokens, "job_desc_compressed_tokens": jd_tokens}
+
+    if job_desc and total > PROMPT_TOKEN_BUDGET and job_desc in prompt:
+        room = max(PROMPT_TOKEN_BUDGET - (total - jd_tokens), JOB_DESC_MIN_TOKENS)
+        short = compress_job_desc(job_desc, room)
+        prompt = prompt.replace(job_desc, short)
+        stats["job_desc_compressed_tokens"] = estimate_tokens(short)
+
+    stats["prompt_tokens"] = stats["system_tokens"] + estimate_tokens(prompt)
+    stats["max_tokens"] = output_tokens(requested_sections(data, prompt), as_json, ceiling)
+    return prompt, stats["max_tokens"], stats
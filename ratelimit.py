@@ -0,0 +1,159 @@
+"""Admission control: per-client token buckets and a ceiling on model calls.
+
+Two buckets per client (an API key listed in API_KEYS, otherwise the IP):
+
+  req   every request, a flood guard with a generous rate
+  llm   charged only when a request is about to call the model, so cached
+        generations, PDFs and history never spend it
+
+and one lane of ``llm_slots`` concurrent model calls per process. When the
+lane is full a request is refused at once (429 + Retry-After) instead of
+queueing, which keeps worker threads free for the cheap requests: set the
+lane below the worker's thread count and PDF / cached / history requests
+always find a thread. Background work (jobs, batches) waits for a slot
+instead of failing.
+
+Buckets live in memory by default. ``SQLiteBuckets`` keeps them in one file
+so every worker on a box shares the same limits; the model-call lane is
+always per process.
+"""
+import os, time, threading
+from collections import OrderedDict
+
+from sqlite_conn import LocalConnection, writable_path
+
+
+class RateLimited(Exception):
+    def __init__(self, msg, retry_after, reason):
+        super().__init__(msg)
+        self.retry_after, self.reason = retry_after, reason
+
+
+class OverCapacity(ValueError):
+    """A single charge bigger than the bucket can ever hold."""
+
+
+def _refill(tokens, updated, now, rate, burst, cost):
+    """New bucket level and how long to wait (0 when ``cost`` was taken)."""
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+
+class MemoryBuckets:
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self.data  = OrderedDict()     # key -> (tokens, updated)
+        self.mutex = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        now = time.time()
+        with self.mutex:
+            tokens, updated = self.data.pop(key, (burst, now))
+            tokens, wait = _refill(tokens, updated, now, rate, burst, cost)
+            self.data[key] = (tokens, now)
+            # Forgetting the oldest client only ever hands it a full bucket.
+            while len(self.data) > self.max_keys:
+                self.data.popitem(last=False)
+        return wait
+
+
+BUCKETS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL) WITHOUT ROWID;
+"""
+
+
+class SQLiteBuckets:
+    def __init__(self, path):
+        self.path  = path
+        self._conn = LocalConnection(path, timeout=5, schema=BUCKETS_SCHEMA)
+        self.takes = 0
+
+    def take(self, key, rate, burst, cost=1):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key=?",
+                               (key,)).fetchone()
+            tokens, wait = _refill(*(row or (burst, now)), now, rate, burst, cost)
+            conn.execute("INSERT OR REPLACE INTO buckets (key,tokens,updated) "
+                         "VALUES (?,?,?)", (key, tokens, now))
+            self.takes += 1
+            if self.takes % 1000 == 0:
+                # Idle for an hour means full again; the row carries nothing.
+                conn.execute("DELETE FROM buckets WHERE updated < ?", (now - 3600,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+class Limiter:
+    def __init__(self, buckets, limits, llm_slots=16, busy_retry=2.0):
+        self.buckets = buckets
+        self.limits  = limits              # kind -> (per minute, burst)
+        self.llm_slots, self.busy_retry = llm_slots, busy_retry
+        self.inflight = 0
+        self.cond = threading.Condition()
+        self.refused = {"req": 0, "llm": 0, "busy": 0}
+
+    def check(self, client, kind, cost=1):
+        """Spend ``cost`` from ``client``'s ``kind`` bucket or raise RateLimited
+        (OverCapacity if no amount of waiting would cover it)."""
+        per_min, burst = self.limits[kind]
+        if cost > burst:
+            raise OverCapacity(f"{cost} model calls exceed the limit of {burst:.0f} at once")
+        wait = self.buckets.take(f"{kind}:{client}", per_min / 60.0, burst, cost)
+        if wait:
+            self.refused[kind] += 1
+            raise RateLimited(f"Rate limit exceeded, retry in {wait:.0f}s", wait, kind)
+
+    def burst(self, kind):
+        return self.limits[kind][1]
+
+    def acquire(self, block=False, timeout=None):
+        """Take a model-call slot. Without ``block`` a full lane raises
+        RateLimited straight away."""
+        with self.cond:
+            if not block and self.inflight >= self.llm_slots:
+                self.refused["busy"] += 1
+                raise RateLimited("Too many model calls in progress",
+                                  self.busy_retry, "busy")
+            if not self.cond.wait_for(lambda: self.inflight < self.llm_slots, timeout):
+                raise RateLimited("Timed out waiting for a model slot",
+                                  self.busy_retry, "busy")
+            self.inflight += 1
+
+    def release(self):
+        with self.cond:
+            self.inflight -= 1
+            self.cond.notify()
+
+    def stats(self):
+        return {"store": type(self.buckets).__name__, "llm_inflight": self.inflight,
+                "llm_slots": self.llm_slots, "refused": dict(self.refused),
+                "limits": {k: {"per_minute": r, "burst": b}
+                           for k, (r, b) in self.limits.items()}}
+
+
+def open_limiter():
+    """Limiter from RATE_LIMIT_STORE (memory|sqlite) and the RATE_* limits,
+    or None when RATE_LIMIT=0."""
+    if os.getenv("RATE_LIMIT", "1") == "0":
+        return None
+    kind = os.getenv("RATE_LIMIT_STORE", "memory").lower()
+    if kind == "sqlite":
+        buckets = SQLiteBuckets(writable_path(os.getenv("RATE_LIMIT_PATH", "ratelimit.sqlite3")))
+    elif kind == "memory":
+        buckets = MemoryBuckets()
+    else:
+        raise ValueError(f"Unknown RATE_LIMIT_STORE: {kind}")
+    limits = {
+        "req": (float(os.getenv("RATE_REQ_PER_MIN", 300)), float(os.getenv("RATE_REQ_BURST", 100))),
+        "llm": (float(os.getenv("RATE_LLM_PER_MIN", 10)),  float(os.getenv("RATE_LLM_BURST", 5))),
+    }
+    return Limiter(buckets, limits, llm_slots=int(os.getenv("LLM_MAX_INFLIGHT", 16)))
@@ -0,0 +1,320 @@
+"""Parsing of the model's free-text output into resume sections.
+
+``ResumeParser`` is incremental: ``feed()`` it text as the model streams it
+and it hands back events as soon as each line is complete,
+
+  {"type": "section", "section": "experience"}
+  {"type": "entry",   "section": "experience", "entry": {...}}
+  {"type": "item",    "section": "skills", "value": "Python"}
+
+and ``close()`` returns the finished structured dict, so no second pass over
+the text is needed once the stream ends. ``parse_structured`` is the
+one-shot wrapper; ``OutputParser`` does the same for the model's whole
+output, feeding only the part between the RESUME and COVER LETTER markers.
+"""
+import re
+
+# Bump whenever a change here would parse the same text differently; stored
+# records tagged with an older version are re-parsed on their next download.
+PARSER_VERSION = 1
+
+# ─────────────────────────────────────────────────────────────
+#  PARSE AI TEXT → structured dict
+# ─────────────────────────────────────────────────────────────
+SECTION_MAP = {
+    "SUMMARY":"summary","PROFILE":"summary","OBJECTIVE":"summary",
+    "PROFESSIONAL SUMMARY":"summary",
+    "EXPERIENCE":"experience","WORK EXPERIENCE":"experience",
+    "PROFESSIONAL EXPERIENCE":"experience","INTERNSHIPS":"experience",
+    "EDUCATION":"education","ACADEMIC BACKGROUND":"education",
+    "SKILLS":"skills_ai","TECHNICAL SKILLS":"skills_ai",
+    "PROJECTS":"projects","KEY PROJECTS":"projects",
+    "CERTIFICATIONS":"certifications","CERTIFICATES":"certifications",
+    "LANGUAGES":"languages_ai","LANGUAGE":"languages_ai",
+}
+# Every header starts with one of these, so most body lines can skip the
+# upper()/strip()/lookup entirely.
+HEADER_INITIALS = frozenset(k[0] for k in SECTION_MAP)
+ENTRY_SECTIONS  = ("experience", "education", "projects")
+PUBLIC_NAME     = {"skills_ai": "skills", "languages_ai": "languages"}
+
+
+def section_of(s):
+    """Canonical section for header line ``s`` (already stripped), or None."""
+    if s[0].upper()[:1] not in HEADER_INITIALS:
+        return None
+    return SECTION_MAP.get(s.upper().rstrip(":").strip())
+
+
+class ResumeParser:
+    def __init__(self, raw):
+        self.raw = raw
+        self.d = d = {
+            "name":     raw.get("name",""),
+            "email":    raw.get("email",""),
+            "phone":    raw.get("phone",""),
+            "linkedin": raw.get("linkedin",""),
+            "location": raw.get("location",""),
+            "summary":"", "skills":[], "experience":[],
+            "education":[], "projects":[], "certifications":[], "languages":[]
+        }
+
+        # Pull skills directly from form data (most reliable)
+        raw_skills = raw.get("skills","")
+        if raw_skills:
+            for sk in re.split(r'[,\n]', raw_skills):
+                sk = sk.strip().lstrip("-* ")
+                if sk: d["skills"].append(sk)
+
+        # Pull languages directly from form data
+        raw_langs = raw.get("languages","")
+        if raw_langs:
+            for l in re.split(r'[,\n]', raw_langs):
+                l = l.strip()
+                if l: d["languages"].append(l)
+
+        self.section  = None
+        self.entry    = None
+        self.bullets  = []
+        self.summary_lines = []
+        self.pending  = ""       # partial last line
+        self.events   = []
+        self.result   = None
+
+    # ─── streaming API ───
+    def feed(self, chunk):
+        """Consume ``chunk``; return the events for every line it completed."""
+        text = self.pending + chunk
+        nl = text.rfind("\n")
+        if nl == -1:
+            self.pending = text
+            return []
+        self.pending = text[nl+1:]
+        for line in text[:nl].split("\n"):
+            self._line(line)
+        return self._take()
+
+    def close(self):
+        """Finish the last line and return the structured dict."""
+        if self.result is None:
+            self._line(self.pending)
+            self.pending = ""
+            self._flush()
+            d = self.d
+            d["summary"] = " ".join(self.summary_lines)
+
+            # Fallback: parse education from raw form data
+            if not d["education"] and self.raw.get("education_entries"):
+                for e in self.raw.get("education_entries",[]):
+                    d["education"].append(e)
+
+            # Fallback: parse experience from raw form data
+            if not d["experience"] and self.raw.get("experience_entries"):
+                for e in self.raw.get("experience_entries",[]):
+                    d["experience"].append(e)
+            self.result = d
+        return self.result
+
+    def drain(self):
+        """Events produced by ``close()`` (the final flushed entry)."""
+        return self._take()
+
+    def _take(self):
+        out, self.events = self.events, []
+        return out
+
+    def _emit_item(self, section, value):
+        self.events.append({"type": "item", "section": section, "value": value})
+
+    def _flush(self):
+        if self.entry is None: return
+        self.entry["bullets"] = self.bullets[:]
+        if self.section in ENTRY_SECTIONS:
+            self.d[self.section].append(self.entry)
+            self.events.append({"type": "entry", "section": self.section,
+                                "entry": self.entry})
+        self.entry   = None
+        self.bullets = []
+
+    # ─── per-line state machine ───
+    def _line(self, line):
+        s = line.strip()
+        if not s: return
+        d = self.d
+
+        # Section header detection
+        section = section_of(s)
+        if section is not None:
+            self._flush()
+            self.section = section
+            self.events.append({"type": "section",
+                                "section": PUBLIC_NAME.get(section, section)})
+            return
+
+        current_section = self.section
+        if current_section == "summary":
+            self.summary_lines.append(s)
+            self._emit_item("summary", s)
+
+        elif current_section == "skills_ai" and not d["skills"]:
+            # Only use AI skills if form didn't provide them
+            for sk in re.split(r'[,|]', s):
+                sk = sk.strip().lstrip("-* ")
+                if sk:
+                    d["skills"].append(sk)
+                    self._emit_item("skills", sk)
+
+        elif current_section == "experience":
+            if s.startswith("- ") or s.startswith("* "):
+                self.bullets.append(s[2:].strip())
+            elif "|" in s:
+                self._flush()
+                parts = [p.strip() for p in s.split("|")]
+                date_str = parts[2] if len(parts)>2 else ""
+                date_parts = [x.strip() for x in date_str.split("-")]
+                self.entry = {
+                    "role":    parts[0] if parts else "",
+                    "company": parts[1] if len(parts)>1 else "",
+                    "start":   date_parts[0] if date_parts else "",
+                    "end":     date_parts[1] if len(date_parts)>1 else "",
+                    "location":parts[3] if len(parts)>3 else "",
+                }
+                self.bullets = []
+            else:
+                # Plain line: company then role then date pattern
+                entry = self.entry
+                if entry is None:
+                    self._flush()
+                    self.entry = {"company":s,"role":"","start":"","end":"","location":""}
+                    self.bullets = []
+                elif not entry.get("role"):
+                    entry["role"] = s
+                elif not entry.get("start"):
+                    dp = [x.strip() for x in s.split("-")]
+                    entry["start"] = dp[0]
+                    entry["end"]   = dp[1] if len(dp)>1 else ""
+
+        elif current_section == "education":
+            if "|" in s:
+                self._flush()
+                parts = [p.strip() for p in s.split("|")]
+                self.entry = {
+                    "degree":      parts[0] if parts else "",
+                    "institution": parts[1] if len(parts)>1 else "",
+                    "year":        parts[2] if len(parts)>2 else "",
+                    "grade":       parts[3] if len(parts)>3 else "",
+                    "location":    parts[4] if len(parts)>4 else "",
+                }
+                self.bullets = []
+                self._flush()
+            else:
+                entry = self.entry
+                if entry is None:
+                    self.entry = {"institution":s,"degree":"","year":"","grade":"","location":""}
+                    self.bullets = []
+                elif not entry.get("degree"):
+                    entry["degree"] = s
+                elif not entry.get("year"):
+                    # Check if it's a year/grade line
+                    nums = re.findall(r'[\d.]+', s)
+                    if nums: entry["year"] = nums[0]
+                    if len(nums)>1: entry["grade"] = nums[1]
+                elif not entry.get("location"):
+                    entry["location"] = s
+
+        elif current_section == "projects":
+            if s.startswith("- ") or s.startswith("* "):
+                self.bullets.append(s[2:].strip())
+            else:
+                self._flush()
+                if "|" in s:
+                    parts = [p.strip() for p in s.split("|")]
+                    self.entry = {"name":parts[0],"tech":parts[1] if len(parts)>1 else ""}
+                else:
+                    self.entry = {"name":s,"tech":""}
+                self.bullets = []
+
+        elif current_section == "certifications":
+            cert = s.lstrip("-* ").strip()
+            if cert and cert.upper() not in SECTION_MAP:
+                d["certifications"].append(cert)
+                self._emit_item("certifications", cert)
+
+        elif current_section == "languages_ai" and not d["languages"]:
+            # Only use if form didn't give us languages
+            for l in re.split(r'[,]', s):
+                l = l.strip().lstrip("-* ")
+                if l and l.upper() not in SECTION_MAP and len(l) < 40:
+                    d["languages"].append(l)
+                    self._emit_item("languages", l)
+
+
+def parse_structured(resume_text, raw):
+    parser = ResumeParser(raw)
+    parser.feed(resume_text)
+    return parser.close()
+
+
+RESUME_MARK = "--- RESUME ---"
+COVER_MARK  = "--- COVER LETTER ---"
+
+
+class OutputParser:
+    """Stream the full model output; parse the resume section as it arrives."""
+    def __init__(self, raw):
+        self.raw     = raw
+        self.resume  = ResumeParser(raw)
+        self.state   = "before"     # before -> resume -> cover
+        self.pending = ""
+        self.fed     = []
+
+    def feed(self, chunk):
+        text = self.pending + chunk
+        nl = text.rfind("\n")
+        if nl == -1:
+            self.pending = text
+            return []
+        self.pending = text[nl+1:]
+        events = []
+        for line in text[:nl+1].splitlines(keepends=True):
+            events += self._line(line)
+        return events
+
+    def _line(self, line):
+        if self.state == "before":
+            i = line.find(RESUME_MARK)
+            if i == -1:
+                return []
+            self.state = "resume"
+            line = line[i+len(RESUME_MARK):]
+        if self.state != "resume":
+            return []
+        i = line.find(COVER_MARK)
+        if i != -1:
+            self.state, line = "cover", line[:i]
+        self.fed.append(line)
+        return self.resume.feed(line)
+
+    def close(self, output):
+        """Structured dict for ``output`` (the full text that was fed)."""
+        if self.pending:
+            self.feed("\n")
+        resume_text, _ = parse_output(output)
+        # Only trust the live parse if it saw exactly what parse_output picks
+        # out; an output without markers is re-parsed whole.
+        if self.state == "cover" and "".join(self.fed).strip() == resume_text:
+            return self.resume.close()
+        return parse_structured(resume_text, self.raw)
+
+    def drain(self):
+        """Events for the entry still open when the stream ended."""
+        return self.resume.drain()
+
+
+def parse_output(output):
+    r = output.find("--- RESUME ---")
+    c = output.find("--- COVER LETTER ---")
+    if r!=-1 and c!=-1:
+        return (output[r+len("--- RESUME ---"):c].strip(),
+                output[c+len("--- COVER LETTER ---"):].strip())
+    return output.strip(), output.strip()
@@ -0,0 +1,158 @@
+"""JSON-mode generation: the model returns the structured resume directly.
+
+With ``response_format={"type": "json_object"}`` Groq guarantees syntactically
+valid JSON; ``from_model`` checks it against the shape below and merges in
+the form data the same way ``resume_parser.parse_structured`` does, so the
+PDF builders cannot tell which path a record came from.
+
+  {"summary": str,
+   "experience":     [{"role", "company", "start", "end", "location", "bullets": [str]}],
+   "education":      [{"degree", "institution", "year", "grade", "location"}],
+   "skills":         [str],
+   "projects":       [{"name", "tech", "bullets": [str]}],
+   "certifications": [str],
+   "languages":      [str],
+   "cover_letter":   str}
+
+``user_prompt`` sends the candidate data and nothing else: every formatting
+instruction lives in SYSTEM_PROMPT. A client's free-text ``full_prompt``
+asks for the ``--- RESUME ---`` layout, so it is used only when no form
+fields came with it.
+
+``to_text`` writes the same content back out in the free-text format, which
+is what the history page, jobs API and cover-letter PDF read.
+"""
+import json
+
+from resume_parser import ResumeParser, RESUME_MARK, COVER_MARK
+
+CONTACT_FIELDS = ("name", "email", "phone", "linkedin", "location")
+ENTRY_FIELDS = {
+    "experience": ("role", "company", "start", "end", "location"),
+    "education":  ("degree", "institution", "year", "grade", "location"),
+    "projects":   ("name", "tech"),
+}
+LIST_FIELDS = ("skills", "certifications", "languages")
+
+SYSTEM_PROMPT = """You are a professional resume writer. Reply with ONE JSON object:
+{"summary": "4-5 sentences, implied first person (never the candidate's name or he/she)",
+ "experience": [{"role","company","start","end","location","bullets":[max 3, action verbs]}],
+ "education": [{"degree","institution","year","grade","location"}],
+ "skills": ["..."],
+ "projects": [{"name","tech","bullets":[max 2]}],
+ "certifications": ["..."],
+ "languages": ["English: Fluent", "..."],
+ "cover_letter": "full cover letter, paragraphs separated by blank lines"}
+All values are plain strings (no markdown). Use real candidate details only,
+tailor them to the job description if one is given and keep the resume to
+one page."""
+
+# Form fields sent to the model in JSON mode, in prompt order.
+PROMPT_FIELDS = (("name", "Name"), ("job_title", "Target role"), ("skills", "Skills"),
+                 ("languages", "Languages"), ("experience", "Experience"),
+                 ("education", "Education"), ("projects", "Projects"),
+                 ("certifications", "Certifications"), ("job_desc", "Job description"))
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _str(value, where):
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if not isinstance(value, str):
+        raise SchemaError(f"{where}: expected a string")
+    return value.strip()
+
+
+def _strings(value, where):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise SchemaError(f"{where}: expected a list")
+    out = [_str(v, f"{where}[{i}]") for i, v in enumerate(value)]
+    return [v for v in out if v]
+
+
+def _entries(value, section):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise SchemaError(f"{section}: expected a list")
+    out = []
+    for i, item in enumerate(value):
+        where = f"{section}[{i}]"
+        if not isinstance(item, dict):
+            raise SchemaError(f"{where}: expected an object")
+        entry = {k: _str(item.get(k), f"{where}.{k}") for k in ENTRY_FIELDS[section]}
+        entry["bullets"] = _strings(item.get("bullets"), f"{where}.bullets")
+        out.append(entry)
+    return out
+
+
+def validate(obj):
+    """Normalise a structured resume dict; raise ``SchemaError`` if malformed."""
+    if not isinstance(obj, dict):
+        raise SchemaError("expected a JSON object")
+    d = {k: _str(obj.get(k), k) for k in CONTACT_FIELDS}
+    d["summary"] = _str(obj.get("summary"), "summary")
+    for section in LIST_FIELDS:
+        d[section] = _strings(obj.get(section), section)
+    for section in ENTRY_FIELDS:
+        d[section] = _entries(obj.get(section), section)
+    return d
+
+
+def from_model(text, raw):
+    """(structured, cover_letter) from a JSON-mode completion."""
+    try:
+        obj = json.loads(text)
+    except ValueError as e:
+        raise SchemaError(f"model did not return JSON: {e}")
+    if not isinstance(obj, dict):
+        raise SchemaError("expected a JSON object")
+    cover = _str(obj.get("cover_letter"), "cover_letter")
+    d = validate(obj)
+
+    # Same precedence as the text parser: form data wins for contact
+    # details, skills and languages; form entries fill empty sections.
+    base = ResumeParser(raw).d
+    for k in CONTACT_FIELDS:
+        d[k] = base[k]
+    for k in ("skills", "languages"):
+        if base[k]:
+            d[k] = base[k]
+    for k in ("education", "experience"):
+        if not d[k] and raw.get(f"{k}_entries"):
+            d[k] = list(raw[f"{k}_entries"])
+    return d, cover
+
+
+def user_prompt(data):
+    """Candidate data for a JSON-mode request, one ``Label: value`` per field.
+    A client that sends only ``full_prompt`` gets it passed through."""
+    lines = [f"{label}: {str(data[k]).strip()}" for k, label in PROMPT_FIELDS
+             if str(data.get(k) or "").strip()]
+    return "\n".join(lines) or data.get("full_prompt") or "Name: Candidate"
+
+
+def to_text(d, cover):
+    """Render ``d`` back into the free-text output format."""
+    lines = [RESUME_MARK, "SUMMARY", d["summary"], "", "EXPERIENCE"]
+    for e in d["experience"]:
+        lines.append(f"{e.get('role','')} | {e.get('company','')} | "
+                     f"{e.get('start','')} - {e.get('end','')} | {e.get('location','')}")
+        lines += [f"- {b}" for b in e.get("bullets", [])]
+    lines += ["", "EDUCATION"]
+    for e in d["education"]:
+        lines.append(" | ".join(e.get(k, "") for k in ENTRY_FIELDS["education"]))
+    lines += ["", "SKILLS", ", ".join(d["skills"]), "", "PROJECTS"]
+    for p in d["projects"]:
+        lines.append(f"{p['name']} | {p['tech']}")
+        lines += [f"- {b}" for b in p["bullets"]]
+    lines += ["", "CERTIFICATIONS"] + [f"- {c}" for c in d["certifications"]]
+    lines += ["", "LANGUAGES", ", ".join(d["languages"]), "", COVER_MARK, cover]
+    return "\n".join(lines)
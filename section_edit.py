@@ -0,0 +1,172 @@
+"""Regenerate one section of a stored record instead of the whole output.
+
+``build`` makes a small prompt for one target, carrying only that
+section's context:
+
+  summary      the summary, plus role/company headlines and skills
+  experience   one experience entry (``index`` into structured["experience"])
+  projects     the projects section
+  cover        the cover letter, plus the summary and headlines
+
+and a short system prompt with just that section's format rules, so an edit
+costs a few hundred tokens each way instead of the full SYSTEM_PROMPT plus a
+complete resume and cover letter. ``splice`` puts the model's reply back
+into the stored free-text output in place of the old section; the caller
+re-parses the result so output and structured data stay in step.
+``check_splice`` tries a placeholder first, so an edit that cannot be
+spliced fails before the model is called.
+"""
+import re
+
+from prompt_budget import compress_job_desc
+from resume_parser import section_of, RESUME_MARK, COVER_MARK
+
+TARGETS    = ("summary", "experience", "projects", "cover")
+MAX_TOKENS = {"summary": 250, "experience": 300, "projects": 400, "cover": 800}
+JOB_DESC_TOKENS = 200
+
+SYSTEM_BASE = """You are a professional resume writer revising ONE part of an existing resume.
+- Use real candidate details only
+- No markdown (no ** or ##), no section header, no commentary
+- Reply with the requested text only
+"""
+SYSTEM_RULES = {
+    "summary": """SUMMARY RULES:
+- Exactly 4-5 sentences
+- NEVER third person, never the candidate's name or he/she
+- Implied first person: start with role/adjective""",
+    "experience": """EXPERIENCE ENTRY — pipe format, max 3 bullets:
+Role Title | Company Name | Start Date - End Date | City
+- Bullet achievement starting with action verb""",
+    "projects": """PROJECTS — max 2 bullets each:
+Project Name | Tech Stack
+- What it does and impact""",
+    "cover": """COVER LETTER:
+- 3-4 short paragraphs separated by blank lines
+- Addressed to the hiring manager, signed with the candidate's name""",
+}
+
+BULLET = re.compile(r"^[-*] ")
+
+
+class EditError(ValueError):
+    """The request or the stored record does not allow this edit."""
+
+
+def _headlines(structured):
+    return "; ".join(f"{e.get('role','')} at {e.get('company','')}".strip()
+                     for e in structured.get("experience", [])) or "none"
+
+def _entry_text(e):
+    lines = [f"{e.get('role','')} | {e.get('company','')} | "
+             f"{e.get('start','')} - {e.get('end','')} | {e.get('location','')}"]
+    return "\n".join(lines + [f"- {b}" for b in e.get("bullets", [])])
+
+def _project_text(p):
+    return "\n".join([f"{p.get('name','')} | {p.get('tech','')}"] +
+                     [f"- {b}" for b in p.get("bullets", [])])
+
+def _cover_text(output):
+    c = output.find(COVER_MARK)
+    return output[c+len(COVER_MARK):].strip() if c != -1 else ""
+
+
+def build(target, record, structured, index=None, instructions="", job_desc=""):
+    """Return ``(system_prompt, prompt, max_tokens)`` for one edit."""
+    for name, value in (("instructions", instructions), ("job_desc", job_desc)):
+        if not isinstance(value, str):
+            raise EditError(f"{name} must be a string")
+    if target not in TARGETS:
+        raise EditError(f"section must be one of {', '.join(TARGETS)}")
+    if target == "experience":
+        if not isinstance(index, int) or not 0 <= index < len(structured["experience"]):
+            raise EditError(f"index must be 0..{len(structured['experience'])-1}")
+
+    parts = [f"Candidate: {record.get('name','')}", f"Target role: {record.get('job_title','')}"]
+    if job_desc.strip():
+        parts.append("Job description (key lines):\n" +
+                     compress_job_desc(job_desc, JOB_DESC_TOKENS))
+    if instructions.strip():
+        parts.append(f"Change requested: {instructions.strip()}")
+
+    if target == "summary":
+        parts += [f"Experience: {_headlines(structured)}",
+                  f"Skills: {', '.join(structured.get('skills', [])[:25])}",
+                  f"Current summary:\n{structured.get('summary','')}",
+                  "Write the new summary."]
+    elif target == "experience":
+        parts += [f"Current entry:\n{_entry_text(structured['experience'][index])}",
+                  "Rewrite this one entry. Keep role, company, dates and city unless asked."]
+    elif target == "projects":
+        current = "\n".join(_project_text(p) for p in structured.get("projects", []))
+        parts += [f"Current projects:\n{current or 'none'}", "Rewrite the projects."]
+    else:
+        cover = _cover_text(record.get("output", ""))
+        if not cover:
+            raise EditError("Record has no cover letter")
+        parts += [f"Summary: {structured.get('summary','')}",
+                  f"Experience: {_headlines(structured)}",
+                  f"Current cover letter:\n{cover}", "Write the new cover letter."]
+
+    return SYSTEM_BASE + "\n" + SYSTEM_RULES[target], "\n\n".join(parts), MAX_TOKENS[target]
+
+
+def clean_reply(text):
+    """Model reply without fences, bold markup or an echoed header line."""
+    lines = [l.rstrip() for l in text.replace("**", "").split("\n")
+             if not l.strip().startswith("```")]
+    while lines and (not lines[0].strip() or section_of(lines[0].strip())):
+        lines.pop(0)
+    return "\n".join(lines).strip()
+
+
+def check_splice(output, target, index=None):
+    """Raise EditError now if no reply for ``target`` could be spliced in."""
+    splice(output, target, "-", index)
+
+
+def splice(output, target, reply, index=None):
+    """``output`` with ``target`` replaced by the cleaned ``reply``."""
+    if not reply:
+        raise EditError("Model returned an empty section")
+    lines = output.split("\n")
+    r = next((i for i, l in enumerate(lines) if RESUME_MARK in l), -1)
+    c = next((i for i, l in enumerate(lines) if COVER_MARK in l), len(lines))
+
+    if target == "cover":
+        if c == len(lines):
+            raise EditError("Record has no cover letter")
+        return "\n".join(lines[:c+1] + [reply])
+
+    # Section bodies in the resume part: key -> (first body line, end)
+    headers = [(i, section_of(l.strip())) for i, l in enumerate(lines[r+1:c], r+1)
+               if l.strip() and section_of(l.strip())]
+    bodies = {key: (i + 1, headers[n+1][0] if n + 1 < len(headers) else c)
+              for n, (i, key) in enumerate(headers)}
+    new = reply.split("\n")
+
+    if target == "experience":
+        if "experience" not in bodies:
+            raise EditError("Record has no experience section")
+        start, end = bodies["experience"]
+        entries = [i for i in range(start, end)
+                   if lines[i].strip() and not BULLET.match(lines[i].strip())]
+        if len(entries) <= index or not all("|" in lines[i] for i in entries):
+            raise EditError("Stored experience is not in the pipe format; "
+                            "regenerate the whole resume instead")
+        head = entries[index]
+        stop = entries[index+1] if index + 1 < len(entries) else end
+        while stop > head + 1 and not lines[stop-1].strip():
+            stop -= 1
+        # A reply of bullets only keeps the entry's header line.
+        if not any("|" in l and not BULLET.match(l.strip()) for l in new):
+            new = [lines[head]] + [l for l in new if l.strip()]
+        return "\n".join(lines[:head] + new + lines[stop:])
+
+    key = target
+    if key not in bodies:
+        # Missing section: summary goes first, projects last in the resume.
+        at = r + 1 if key == "summary" else c
+        return "\n".join(lines[:at] + [key.upper()] + new + [""] + lines[at:])
+    start, end = bodies[key]
+    return "\n".join(lines[:start] + new + [""] + lines[end:])
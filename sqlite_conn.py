@@ -0,0 +1,48 @@
+"""Per-thread SQLite connections shared by every SQLite-backed store
+(history, jobs, disk cache, rate-limit buckets).
+
+    conn = LocalConnection("jobs.sqlite3")
+    conn().execute(...)
+
+Each thread gets its own connection, in autocommit mode (writers open their
+own ``BEGIN IMMEDIATE``), WAL journal and a busy timeout so concurrent
+writers queue instead of failing with "database is locked". Connections
+never cross a fork: a new pid gets a new connection (gunicorn --preload).
+Nothing touches the file until the first call; ``schema`` (an SQL script of
+``CREATE ... IF NOT EXISTS``) runs on every new connection, so a store can
+be built at import time and still open lazily.
+
+``writable_path`` moves a data file to the temp dir when its own directory
+is read-only, as the deployment directory is on serverless hosts.
+"""
+import os, sqlite3, logging, tempfile, threading
+
+log = logging.getLogger(__name__)
+
+
+def writable_path(path):
+    """``path``, or the same file name in the temp dir if it can't be written."""
+    target = path if os.path.exists(path) else os.path.dirname(os.path.abspath(path))
+    if os.access(target, os.W_OK):
+        return path
+    alt = os.path.join(tempfile.gettempdir(), os.path.basename(path))
+    log.warning("%s is not writable, using %s instead", path, alt)
+    return alt
+
+
+class LocalConnection:
+    def __init__(self, path, timeout=30, schema=None):
+        self.path, self.timeout, self.schema = path, timeout, schema
+        self.local = threading.local()
+
+    def __call__(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self.schema:
+                conn.executescript(self.schema)
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn